@@ -0,0 +1,65 @@
+"""Бенчмарк подсчёта заполненности данных.
+
+Сравнивает построчный генератор (прежняя реализация load_data)
+с векторизованным FillRatioEngine на синтетических широких и длинных таблицах.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_fill_ratio
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from models.fill_ratio import FillRatioEngine
+
+ZERO_VALUES = ['', ' ', '-', 'NA', 'N/A', 'null', 'NULL', 'NaN', 'nan']
+
+
+def legacy_fill_ratio(df, zero_values):
+    """Прежний подсчёт: проверка каждой ячейки в Python"""
+    non_empty_cells = sum(
+        sum(1 for x in df[col] if pd.notna(x) and str(x).strip() not in zero_values)
+        for col in df.columns
+    )
+    return non_empty_cells / df.size * 100
+
+
+def make_frame(rows, cols, seed=0):
+    """Синтетическая таблица: половина числовых колонок, половина строковых с пропусками"""
+    rng = np.random.default_rng(seed)
+    data = {}
+    tokens = np.array(['alpha', 'beta', 'gamma', 'NA', '', ' ', '-', 'delta'], dtype=object)
+    for i in range(cols):
+        if i % 2 == 0:
+            values = rng.normal(size=rows)
+            values[rng.random(rows) < 0.1] = np.nan
+            data[f'num_{i}'] = values
+        else:
+            data[f'str_{i}'] = tokens[rng.integers(0, len(tokens), size=rows)]
+    return pd.DataFrame(data)
+
+
+def run(name, df):
+    start = time.perf_counter()
+    legacy = legacy_fill_ratio(df, ZERO_VALUES)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    total, _ = FillRatioEngine(ZERO_VALUES).compute(df)
+    engine_time = time.perf_counter() - start
+
+    assert abs(total - legacy) < 1e-9, (total, legacy)
+    print(f"{name:<28} {df.shape[0]:>9} x {df.shape[1]:<4} "
+          f"генератор: {legacy_time:8.3f} c  движок: {engine_time:8.4f} c  "
+          f"ускорение: {legacy_time / engine_time:7.1f}x")
+
+
+def main():
+    run('Длинная таблица', make_frame(1_000_000, 4))
+    run('Широкая таблица', make_frame(20_000, 400))
+    run('Квадратная таблица', make_frame(200_000, 40))
+
+
+if __name__ == '__main__':
+    main()
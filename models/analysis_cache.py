@@ -0,0 +1,200 @@
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'data_analyser')
+
+
+class AnalysisCache:
+    """Дисковый кэш разобранных датасетов и рассчитанных статистик.
+
+    Запись кэша — каталог с таблицей в колоночном формате (Parquet, если
+    установлен pyarrow, иначе pickle) и файлами статистик. Ключ строится
+    из содержимого файла (или быстрого отпечатка размер+mtime) и параметров
+    обработки. Объём кэша ограничен, при превышении удаляются записи,
+    к которым дольше всего не обращались (LRU).
+
+    Ошибки кэша никогда не прерывают загрузку: они логируются, а данные
+    считаются заново.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=5 * 1024 ** 3, hash_content=False):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        # False — быстрый отпечаток (путь, размер, mtime); True — хэш содержимого
+        self.hash_content = hash_content
+
+    def file_key(self, file_name):
+        """Отпечаток исходного файла"""
+        stat = os.stat(file_name)
+        if not self.hash_content:
+            return f"{os.path.abspath(file_name)}|{stat.st_size}|{stat.st_mtime_ns}"
+        digest = hashlib.blake2b(digest_size=20)
+        with open(file_name, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return f"blake2b:{digest.hexdigest()}|{stat.st_size}"
+
+    @staticmethod
+    def make_key(base, **options):
+        """Ключ записи: отпечаток файла (или родительский ключ) + параметры"""
+        payload = json.dumps({'base': base, 'options': options}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def load_frame(self, key):
+        """Чтение таблицы из кэша или None"""
+        entry = self._entry_dir(key)
+        try:
+            if os.path.exists(os.path.join(entry, 'frame.parquet')):
+                df = pd.read_parquet(os.path.join(entry, 'frame.parquet'))
+            elif os.path.exists(os.path.join(entry, 'frame.pkl')):
+                df = pd.read_pickle(os.path.join(entry, 'frame.pkl'))
+            else:
+                return None
+        except Exception as e:
+            logging.warning(f"Повреждённая запись кэша {key}: {str(e)}")
+            self._remove(entry)
+            return None
+        self._touch(entry)
+        logging.info(f"Попадание в кэш: {key}")
+        return df
+
+    def save_frame(self, key, df, stats=None):
+        """Сохранение таблицы (и, при необходимости, статистик) в кэш"""
+        entry = self._entry_dir(key)
+        try:
+            os.makedirs(entry, exist_ok=True)
+            if not self._write_parquet(df, os.path.join(entry, 'frame.parquet')):
+                df.to_pickle(os.path.join(entry, 'frame.pkl'))
+            if stats:
+                self.save_stats(key, stats)
+            self._touch(entry)
+        except Exception as e:
+            logging.warning(f"Не удалось сохранить датасет в кэш: {str(e)}")
+            self._remove(entry)
+            return
+        self._evict(keep=entry)
+
+    def load_stats(self, key):
+        """Все сохранённые статистики записи"""
+        stats_dir = os.path.join(self._entry_dir(key), 'stats')
+        stats = {}
+        if not os.path.isdir(stats_dir):
+            return stats
+        for file_name in os.listdir(stats_dir):
+            name, ext = os.path.splitext(file_name)
+            if ext != '.pkl':
+                continue
+            try:
+                with open(os.path.join(stats_dir, file_name), 'rb') as f:
+                    stats[name] = pickle.load(f)
+            except Exception as e:
+                logging.warning(f"Не удалось прочитать статистику {name} из кэша: {str(e)}")
+        return stats
+
+    def save_stats(self, key, stats):
+        """Добавление статистик к существующей записи"""
+        entry = self._entry_dir(key)
+        if not os.path.isdir(entry):
+            return
+        stats_dir = os.path.join(entry, 'stats')
+        try:
+            os.makedirs(stats_dir, exist_ok=True)
+            for name, value in stats.items():
+                with open(os.path.join(stats_dir, f'{name}.pkl'), 'wb') as f:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logging.warning(f"Не удалось сохранить статистики в кэш: {str(e)}")
+            return
+        self._evict(keep=entry)
+
+    def clear(self):
+        """Полная очистка кэша"""
+        self._remove(self.cache_dir)
+
+    def _write_parquet(self, df, path):
+        if not HAS_PYARROW:
+            return False
+        try:
+            df.to_parquet(path)
+            return True
+        except Exception as e:
+            # Например, колонки со смешанными типами значений
+            logging.info(f"Parquet недоступен для этого датасета, используется pickle: {str(e)}")
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    @staticmethod
+    def _touch(entry):
+        os.utime(entry)
+
+    @staticmethod
+    def _remove(path):
+        shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for root, _, files in os.walk(path):
+            for file_name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, file_name))
+                except OSError:
+                    pass
+        return total
+
+    def _evict(self, keep=None):
+        """Удаление давно неиспользуемых записей сверх лимита объёма"""
+        try:
+            entries = [e for e in os.scandir(self.cache_dir) if e.is_dir()]
+        except OSError:
+            return
+        sized = [(e.stat().st_mtime, e.path, self._dir_size(e.path)) for e in entries]
+        total = sum(size for _, _, size in sized)
+        for _, path, size in sorted(sized):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            self._remove(path)
+            total -= size
+            logging.info(f"Запись кэша удалена (LRU): {os.path.basename(path)}")
+
+
+def cached_result(name):
+    """Мемоизация результата метода модели до изменения данных.
+
+    Результат хранится в self._results и, если для текущих данных есть
+    ключ кэша, сохраняется на диск через self._store_result. name — имя
+    результата или функция self -> имя, если результат зависит от
+    настроек модели.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self):
+            key = name(self) if callable(name) else name
+            if key in self._results:
+                return self._results[key]
+            result = method(self)
+            if result is not None:
+                self._store_result(key, result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,101 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Статистики числовой колонки: describe() (count, mean, std, min,
+# квартили, max), межквартильный размах, усы бокс-плота (крайние
+# значения в пределах 1.5·IQR от квартилей), число выбросов ниже и выше
+# усов и значения выбросов для рисования (различные, не больше max_fliers)
+BoxStats = namedtuple('BoxStats', ['count', 'mean', 'std', 'min', 'q1', 'median', 'q3', 'max', 'iqr',
+                                   'whislo', 'whishi', 'outliers_low', 'outliers_high', 'fliers'])
+
+# Строки describe() из хранилища статистик: стандартные строки pandas
+# и строки бокс-плота
+DESCRIBE_ROWS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+BOX_ROWS = ['iqr', 'whisker_low', 'whisker_high', 'outliers_low', 'outliers_high']
+
+
+class BoxStatsStore:
+    """Хранилище статистик числовых колонок (BoxStats).
+
+    Квартили, усы и выбросы считаются для колонки один раз и
+    запоминаются по имени колонки до сброса (данные изменились); из
+    хранилища берутся describe(), бокс-плоты (Axes.bxp без повторной
+    сортировки значений) и статистика в экспорте.
+    """
+
+    def __init__(self, whis=1.5, max_fliers=1000):
+        self.whis = whis
+        self.max_fliers = max_fliers
+        self._stats = {}
+
+    def reset(self):
+        """Сброс запомненных статистик (данные изменились)"""
+        self._stats = {}
+
+    def stats(self, column):
+        """Статистики колонки (Series)"""
+        if column.name not in self._stats:
+            self._stats[column.name] = column_box_stats(column, self.whis, self.max_fliers)
+        return self._stats[column.name]
+
+    def describe(self, df, engine=None):
+        """describe() числовых колонок df со строками бокс-плота.
+
+        Недостающие в хранилище колонки считаются в пуле engine
+        (ColumnStatsEngine), если он передан.
+        """
+        missing = [i for i, name in enumerate(df.columns) if name not in self._stats]
+        if missing:
+            subset = df.iloc[:, missing]
+            if engine is not None:
+                results = engine.map(self._compute, subset)
+            else:
+                results = [self._compute(subset.iloc[:, i]) for i in range(subset.shape[1])]
+            for name, result in zip(subset.columns, results):
+                self._stats[name] = result
+        return describe_frame([self._stats[name] for name in df.columns], df.columns)
+
+    def _compute(self, column):
+        return column_box_stats(column, self.whis, self.max_fliers)
+
+
+def column_box_stats(column, whis=1.5, max_fliers=1000):
+    """Статистики колонки: квартили одним частичным упорядочиванием, усы и выбросы — масками"""
+    values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = values[~np.isnan(values)]
+    count = len(values)
+    if count == 0:
+        return BoxStats(0, *[np.nan] * 10, 0, 0, np.empty(0))
+
+    # Минимум, квартили и максимум — одним вызовом (np.partition по нужным позициям)
+    minimum, q1, median, q3, maximum = np.quantile(values, [0, 0.25, 0.5, 0.75, 1])
+    mean = values.mean()
+    std = values.std(ddof=1) if count > 1 else np.nan
+    iqr = q3 - q1
+    low, high = q1 - whis * iqr, q3 + whis * iqr
+
+    # Усы — крайние значения в пределах границ (не дальше квартилей), как в matplotlib
+    below, above = values < low, values > high
+    inside = values[~(below | above)]
+    whislo = min(inside.min(), q1) if len(inside) else q1
+    whishi = max(inside.max(), q3) if len(inside) else q3
+    fliers = np.unique(values[below | above])
+    if len(fliers) > max_fliers:
+        # Близкие выбросы на графике сливаются: оставляем по одному значению
+        # на каждую max_fliers-ю часть их диапазона (крайние сохраняются)
+        slots = ((fliers - fliers[0]) * ((max_fliers - 1) / (fliers[-1] - fliers[0]))).astype(np.intp)
+        keep = np.ones(len(fliers), dtype=bool)
+        keep[1:-1] = slots[1:-1] != slots[:-2]
+        fliers = fliers[keep]
+    return BoxStats(count, mean, std, minimum, q1, median, q3, maximum, iqr, whislo, whishi,
+                    int(below.sum()), int(above.sum()), fliers)
+
+
+def describe_frame(stats, columns):
+    """Таблица describe() со строками бокс-плота по статистикам колонок"""
+    data = [[s.count, s.mean, s.std, s.min, s.q1, s.median, s.q3, s.max,
+             s.iqr, s.whislo, s.whishi, s.outliers_low, s.outliers_high] for s in stats]
+    return pd.DataFrame(np.array(data, dtype=np.float64).reshape(len(stats), -1).T,
+                        index=DESCRIBE_ROWS + BOX_ROWS, columns=columns)
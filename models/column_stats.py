@@ -0,0 +1,197 @@
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+# Сводка значений колонки: число строк и различных значений, первые top_n
+# значений (частоты — Series значение -> частота по убыванию, уникальные
+# значения — Series значений в порядке появления), признак высокой
+# кардинальности и погрешности приближённых оценок (None — точные)
+ValueSummary = namedtuple('ValueSummary', ['rows', 'distinct', 'top', 'high_cardinality',
+                                           'distinct_error', 'count_error'],
+                          defaults=(None, None))
+
+# Доля различных значений среди строк, начиная с которой колонка
+# считается колонкой высокой кардинальности (идентификаторы, ключи)
+HIGH_CARDINALITY_RATIO = 0.5
+
+
+class ColumnStatsEngine:
+    """Расчёт статистик по колонкам параллельно в пуле потоков или процессов.
+
+    Работа делится по колонкам: каждая задача получает одну колонку
+    (Series) и возвращает результат для неё, порядок результатов
+    совпадает с порядком колонок. Функции задач те же, что и при
+    последовательном расчёте, поэтому результаты совпадают с ним точно.
+
+    backend='thread' — общий DataFrame без копирования (NumPy и pandas
+    отпускают GIL на сортировках, хэш-таблицах и редукциях);
+    backend='process' — числовые колонки передаются процессам через
+    разделяемую память (multiprocessing.shared_memory), остальные —
+    сериализацией; процессы запускаются методом spawn (fork
+    многопоточного процесса с Qt небезопасен). Небольшие датасеты
+    считаются последовательно.
+    """
+
+    def __init__(self, workers=None, backend='thread', min_cells=100_000):
+        if backend not in ('thread', 'process'):
+            raise ValueError(f"Неизвестный тип пула: {backend}")
+        self.workers = workers
+        self.backend = backend
+        self.min_cells = min_cells
+
+    @property
+    def max_workers(self):
+        return self.workers or os.cpu_count() or 1
+
+    def map(self, func, df):
+        """Список func(колонка) по всем колонкам df.
+
+        Функция не должна зависеть от индекса: в процессы колонки
+        передаются без него.
+        """
+        n_columns = df.shape[1]
+        workers = min(self.max_workers, n_columns)
+        if workers <= 1 or df.size < self.min_cells:
+            return [func(df.iloc[:, i]) for i in range(n_columns)]
+        if self.backend == 'process':
+            return self._map_processes(func, df, workers)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(func, (df.iloc[:, i] for i in range(n_columns))))
+
+    def describe(self, df):
+        """То же, что df.describe(), с расчётом колонок в пуле"""
+        if df.shape[1] == 0:
+            return df.describe()
+        # Выбор колонок как в DataFrame.describe: числа и даты, иначе все
+        data = df.select_dtypes(include=[np.number, 'datetime'])
+        if len(data.columns) == 0:
+            data = df
+        results = self.map(describe_column, data)
+
+        # Порядок строк как в DataFrame.describe: сначала строки самых коротких
+        # описаний (у дат нет std, поэтому при датах std оказывается последней)
+        names = []
+        for index in sorted((result.index for result in results), key=len):
+            for name in index:
+                if name not in names:
+                    names.append(name)
+        described = pd.concat([result.reindex(names) for result in results], axis=1,
+                              ignore_index=True, sort=False)
+        described.columns = data.columns.copy()
+        return described
+
+    def _map_processes(self, func, df, workers):
+        blocks = []
+        try:
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as pool:
+                futures = []
+                for i in range(df.shape[1]):
+                    column = df.iloc[:, i]
+                    dtype = column.dtype
+                    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+                        values = column.to_numpy()
+                        block = SharedMemory(create=True, size=max(values.nbytes, 1))
+                        blocks.append(block)
+                        np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[:] = values
+                        futures.append(pool.submit(_run_shared, func, block.name, values.dtype.str,
+                                                   len(values), column.name))
+                    else:
+                        futures.append(pool.submit(func, column.reset_index(drop=True)))
+                return [future.result() for future in futures]
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+
+
+def _run_shared(func, block_name, dtype, length, name):
+    """Задача процесса: колонка из разделяемой памяти"""
+    block = SharedMemory(name=block_name)
+    try:
+        values = np.ndarray((length,), dtype=np.dtype(dtype), buffer=block.buf)
+        column = pd.Series(values, name=name, copy=True)
+        del values
+        return func(column)
+    finally:
+        block.close()
+
+
+def describe_column(column):
+    """describe() одной колонки (разреженные колонки — в плотном виде)"""
+    if isinstance(column.dtype, pd.SparseDtype):
+        column = column.sparse.to_dense()
+    return column.describe()
+
+
+def value_counts(column):
+    """Частоты значений колонки"""
+    counts = column.value_counts(dropna=False)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Неиспользуемые категории не выводим
+        counts = counts[counts > 0]
+    return counts
+
+
+def is_high_cardinality(distinct, rows, top_n):
+    """Различных значений больше top_n и не меньше половины строк"""
+    return distinct > top_n and distinct >= HIGH_CARDINALITY_RATIO * rows
+
+
+def unique_summary(column, top_n=20):
+    """Число уникальных значений колонки и первые top_n из них"""
+    uniques = column.unique()
+    distinct = len(uniques)
+    return ValueSummary(len(column), distinct, pd.Series(uniques[:top_n], dtype=column.dtype),
+                        is_high_cardinality(distinct, len(column), top_n))
+
+
+def value_counts_summary(column, top_n=20):
+    """Число различных значений колонки и top_n самых частых.
+
+    Выбираются top_n частот (nlargest) без сортировки всех значений:
+    для колонок-идентификаторов это основная часть работы.
+    """
+    counts = column.value_counts(dropna=False, sort=False)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        counts = counts[counts > 0]
+    return counts_summary(counts, len(column), top_n, sort=True)
+
+
+def counts_summary(counts, rows, top_n=20, sort=False):
+    """Сводка по готовым частотам (sort=False — частоты уже по убыванию)"""
+    top = counts.nlargest(top_n) if sort else counts.head(top_n)
+    return ValueSummary(rows, len(counts), top, is_high_cardinality(len(counts), rows, top_n))
+
+
+def summary_notes(summary, counts=False):
+    """Строки заголовка сводки: число значений, кардинальность, погрешности"""
+    if summary.distinct_error is None:
+        distinct = f"{summary.distinct}"
+    else:
+        distinct = f"≈ {summary.distinct} (±{summary.distinct_error:.1%})"
+    notes = [f"Количество уникальных значений: {distinct}"]
+    if summary.high_cardinality:
+        notes.append(f"Высокая кардинальность: различных значений {summary.distinct / max(summary.rows, 1):.0%} "
+                     f"от {summary.rows} строк (похоже на идентификатор)")
+    if summary.count_error is not None:
+        notes.append(f"Частоты оценены по Count-Min: ±{summary.count_error} строк")
+        if not len(summary.top):
+            notes.append("Нет значений, частота которых превышает погрешность")
+    if 0 < len(summary.top) < summary.distinct:
+        shown = "самых частых" if counts or summary.count_error is not None else "первых"
+        notes.append(f"Показано {shown} значений: {len(summary.top)} (полный список — постранично)")
+    return notes
+
+
+def format_summary(summary, counts=False):
+    """Сводка значений одной строкой: заголовок и первые значения (частоты)"""
+    lines = summary_notes(summary, counts)
+    if len(summary.top):
+        lines.append(summary.top.to_string() if counts else summary.top.to_string(index=False))
+    return "\n".join(lines)
@@ -0,0 +1,271 @@
+import codecs
+import csv
+import io
+import logging
+import traceback
+
+import numpy as np
+
+
+class MappedReader(io.RawIOBase):
+    """Бинарный поток поверх отображённого в память файла (mmap).
+
+    Байты копируются напрямую из отображения в буфер читателя (pandas),
+    без промежуточных объектов bytes; position — число выданных байтов.
+    """
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self.position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), len(self._view) - self.position)
+        buffer[:n] = self._view[self.position:self.position + n]
+        self.position += n
+        return n
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+class ColumnCountValidator:
+    """Потоковая проверка количества колонок в каждой строке файла.
+
+    Байты подаются порциями через feed() или целым буфером через
+    feed_buffer(), в памяти хранится только текущая порция и незакрытая
+    (многострочная) запись. Кавычки учитываются по
+    правилам модуля csv, поэтому поля с разделителями и переводами строк
+    внутри кавычек считаются корректно.
+    """
+
+    def __init__(self, delimiter=',', quotechar='"', encoding='utf-8',
+                 expected_cols=None, max_bad_rows=100, skipinitialspace=False,
+                 strip_trailing_empty=False, max_record_lines=10000):
+        self.delimiter = delimiter
+        self.quotechar = quotechar
+        self.expected_cols = expected_cols
+        self.max_bad_rows = max_bad_rows
+        self.skipinitialspace = skipinitialspace
+        self.strip_trailing_empty = strip_trailing_empty
+        self.max_record_lines = max_record_lines
+
+        self.invalid_rows = []
+        self.rows_checked = 0
+        self.finished = False
+
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._tail = ''
+        self._pending = []
+        self._in_quotes = False
+        self._line_no = 0
+        self._header_seen = False
+
+    @property
+    def truncated(self):
+        """Достигнут ли лимит сообщаемых ошибочных строк"""
+        return self.max_bad_rows is not None and len(self.invalid_rows) >= self.max_bad_rows
+
+    def feed(self, data):
+        """Обработка очередной порции байтов"""
+        if self.finished:
+            return
+        text = self._tail + self._decoder.decode(data)
+        lines = text.split('\n')
+        self._tail = lines.pop()
+        self._process_lines(lines, text)
+
+    def feed_buffer(self, buffer, block_size=16 * 1024 * 1024, progress_callback=None):
+        """Проверка целого буфера (например, mmap) блоками из полных строк.
+
+        Блоки без кавычек проверяются векторно по байтам: разделители и
+        переводы строк считаются через NumPy прямо в отображённой памяти,
+        без декодирования в строки Python. Блоки с кавычками (и многострочные
+        записи) разбираются модулем csv. Поддерживаются однобайтовые
+        разделители в ASCII-совместимых кодировках (utf-8, cp1251 и т.п.).
+
+        Представление буфера освобождается и при исключении (в том числе
+        при отмене из progress_callback), чтобы отображение можно было закрыть.
+        """
+        view = memoryview(buffer)
+        try:
+            size = len(view)
+            quote = self.quotechar.encode('ascii')
+            vectorizable = len(self.delimiter) == 1 and not self.strip_trailing_empty
+            start = 0
+            while start < size and not self.finished:
+                newline = buffer.find(b'\n', min(start + block_size, size) - 1)
+                stop = size if newline == -1 else newline + 1
+                if (vectorizable and not self._in_quotes and not self._pending
+                        and buffer.find(quote, start, stop) == -1):
+                    self._count_fields_bytes(np.frombuffer(view, dtype=np.uint8,
+                                                           count=stop - start, offset=start))
+                else:
+                    text = bytes(view[start:stop]).decode(self.encoding, errors='replace')
+                    lines = text.split('\n')
+                    if text.endswith('\n'):
+                        lines.pop()
+                    self._process_lines(lines, text)
+                start = stop
+                if progress_callback:
+                    progress_callback(start / size)
+        except BaseException as e:
+            # Массив блока в кадрах трассировки держит ссылку на буфер
+            traceback.clear_frames(e.__traceback__)
+            raise
+        finally:
+            view.release()
+
+    def _count_fields_bytes(self, data):
+        """Векторный подсчёт полей в блоке полных строк без кавычек"""
+        newlines = np.flatnonzero(data == 10)
+        line_ends = newlines
+        if not len(data) or data[-1] != 10:
+            line_ends = np.append(newlines, len(data))
+        line_starts = np.concatenate(([0], newlines + 1))[:len(line_ends)]
+
+        delimiters = np.flatnonzero(data == ord(self.delimiter))
+        fields = (np.searchsorted(delimiters, line_ends)
+                  - np.searchsorted(delimiters, line_starts) + 1)
+        lengths = line_ends - line_starts
+        blank = (lengths == 0) | ((lengths == 1) & (data[np.minimum(line_starts, len(data) - 1)] == 13))
+        rows = np.flatnonzero(~blank)
+
+        if len(rows) and not self._header_seen:
+            self._header_seen = True
+            if self.expected_cols is None:
+                self.expected_cols = int(fields[rows[0]])
+            rows = rows[1:]
+
+        self.rows_checked += len(rows)
+        bad = rows[fields[rows] != self.expected_cols]
+        for i in bad:
+            self._report(self._line_no + int(i) + 1, int(fields[i]))
+            if self.finished:
+                break
+        self._line_no += len(line_ends)
+
+    def close(self):
+        """Обработка остатка данных после конца файла"""
+        if self.finished:
+            return
+        text = self._tail + self._decoder.decode(b'', final=True)
+        self._tail = ''
+        lines = [text] if text else []
+        self._process_lines(lines, text)
+        if self._pending:
+            # Файл закончился внутри кавычек
+            self._report(self._line_no + 1, None)
+            self._pending = []
+        self.finished = True
+
+    def _process_lines(self, lines, text):
+        """Группировка строк в записи с учётом кавычек"""
+        if not lines:
+            return
+        if not self._in_quotes and self.quotechar not in text:
+            batch = self._pending + lines
+            self._pending = []
+            self._check_records(batch)
+            return
+
+        batch = []
+        record = self._pending
+        for line in lines:
+            record.append(line)
+            self._in_quotes = self._ends_in_quotes(line, self._in_quotes)
+            if not self._in_quotes:
+                batch.extend(record)
+                record = []
+            elif len(record) > self.max_record_lines:
+                # Незакрытая кавычка: не держим остаток файла в памяти
+                self._check_records(batch)
+                batch = []
+                self._report(self._line_no + 1, None)
+                self._line_no += len(record)
+                record = []
+                self._in_quotes = False
+        self._pending = record
+        self._check_records(batch)
+
+    def _ends_in_quotes(self, line, in_quotes):
+        """Остаётся ли открытым поле в кавычках в конце строки.
+
+        Как в модуле csv: кавычка открывает поле только в его начале
+        (кавычка внутри поля без кавычек — обычный символ), удвоенная
+        кавычка внутри поля в кавычках — экранированная кавычка.
+        """
+        quote, delimiter = self.quotechar, self.delimiter
+        if quote not in line:
+            return in_quotes
+        pos = 0
+        while True:
+            if in_quotes:
+                end = line.find(quote, pos)
+                if end == -1:
+                    return True
+                if line.startswith(quote, end + 1):
+                    pos = end + 2
+                    continue
+                # Остаток поля после закрывающей кавычки — до разделителя
+                in_quotes = False
+                pos = line.find(delimiter, end + 1)
+            else:
+                if self.skipinitialspace:
+                    while line.startswith(' ', pos):
+                        pos += 1
+                if line.startswith(quote, pos):
+                    in_quotes = True
+                    pos += len(quote)
+                    continue
+                pos = line.find(delimiter, pos)
+            if pos == -1:
+                return False
+            pos += len(delimiter)
+
+    def _check_records(self, batch):
+        """Подсчёт полей в завершённых записях"""
+        if not batch or self.finished:
+            self._line_no += len(batch)
+            return
+        reader = csv.reader(batch, delimiter=self.delimiter, quotechar=self.quotechar,
+                            skipinitialspace=self.skipinitialspace)
+        consumed = 0
+        for row in reader:
+            start_line = self._line_no + consumed + 1
+            consumed = reader.line_num
+            if not row:
+                continue
+            if self.strip_trailing_empty:
+                while row and not row[-1].strip():
+                    row.pop()
+
+            if not self._header_seen:
+                self._header_seen = True
+                if self.expected_cols is None:
+                    self.expected_cols = len(row)
+                continue
+
+            self.rows_checked += 1
+            if len(row) != self.expected_cols:
+                self._report(start_line, len(row))
+                if self.finished:
+                    break
+        self._line_no += len(batch)
+
+    def _report(self, line_no, actual_cols):
+        """Регистрация строки с неправильным количеством колонок"""
+        if self.finished:
+            return
+        self.invalid_rows.append(line_no)
+        if actual_cols is None:
+            logging.warning(f"Строка {line_no}: незакрытая кавычка")
+        else:
+            logging.warning(f"Строка {line_no}: ожидалось {self.expected_cols} колонок, найдено {actual_cols}")
+        if self.truncated:
+            logging.warning(f"Достигнут лимит ошибочных строк ({self.max_bad_rows}), проверка остановлена")
+            self.finished = True
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.cluster.hierarchy import leaves_list, linkage
+    from scipy.spatial.distance import squareform
+except ImportError:
+    linkage = None
+
+
+class CorrelationEngine:
+    """Матрицы корреляций Пирсона и Спирмена для числовых колонок.
+
+    Пирсон считается одним матричным произведением (BLAS) над
+    стандартизованным массивом: Z = (X - mean) / ||X - mean||, R = ZᵀZ.
+    Спирмен — тот же расчёт над рангами колонок (сортировкой каждой
+    колонки, без общего rank() по таблице). При пропусках в данных
+    используется попарный расчёт pandas (как в DataFrame.corr).
+    """
+
+    def pearson(self, df):
+        """То же, что df.corr()"""
+        values = _float_values(df)
+        if len(values) < 2 or np.isnan(values).any():
+            return df.corr()
+        return pd.DataFrame(_pearson(values), index=df.columns, columns=df.columns)
+
+    def spearman(self, df):
+        """То же, что df.corr(method='spearman')"""
+        ranks = self.ranks(df)
+        if len(ranks) < 2 or np.isnan(ranks).any():
+            return df.corr(method='spearman')
+        return pd.DataFrame(_pearson(ranks), index=df.columns, columns=df.columns)
+
+    def ranks(self, df):
+        """Средние ранги значений по колонкам"""
+        # Колонки по отдельности: массив в порядке Fortran
+        values = np.asfortranarray(_float_values(df))
+        if np.isnan(values).any():
+            return df.rank().to_numpy(dtype=np.float64, na_value=np.nan)
+        return np.column_stack([_average_ranks(values[:, i]) for i in range(values.shape[1])])
+
+
+def top_pairs(corr, k=5):
+    """k пар колонок с наибольшей по модулю корреляцией: [(колонка, колонка, значение)].
+
+    Пары берутся из верхнего треугольника матрицы; вместо полной
+    сортировки всех пар используется argpartition. Пропуски (NaN) идут
+    в конце, при равных значениях сохраняется порядок пар в матрице.
+    """
+    values = corr.to_numpy(dtype=np.float64)
+    rows, cols = np.triu_indices(len(values), k=1)
+    pair_values = values[rows, cols]
+    strength = np.abs(pair_values)
+    strength[np.isnan(strength)] = -1.0
+    if k < len(strength):
+        selected = np.argpartition(-strength, k - 1)[:k]
+    else:
+        selected = np.arange(len(strength))
+    selected = selected[np.lexsort((selected, -strength[selected]))]
+    columns = corr.columns
+    return [(columns[rows[p]], columns[cols[p]], pair_values[p]) for p in selected]
+
+
+def cluster_order(corr):
+    """Порядок колонок матрицы корреляций по иерархической кластеризации.
+
+    Среднее связывание по расстоянию 1 - |r|: сильно связанные колонки
+    (в том числе отрицательно) оказываются рядом, и на тепловой карте
+    видны блоки. Без scipy порядок колонок не меняется.
+    """
+    n = len(corr)
+    if linkage is None or n < 3:
+        return np.arange(n)
+    strength = np.nan_to_num(np.abs(corr.to_numpy(dtype=np.float64)), nan=0.0)
+    distance = np.clip(1.0 - (strength + strength.T) / 2, 0.0, 1.0)
+    np.fill_diagonal(distance, 0.0)
+    return leaves_list(linkage(squareform(distance, checks=False), method='average'))
+
+
+def top_correlated(corr, n=20):
+    """Позиции n колонок с наибольшей по модулю корреляцией с какой-либо другой колонкой"""
+    strength = np.nan_to_num(np.abs(corr.to_numpy(dtype=np.float64)), nan=-1.0)
+    np.fill_diagonal(strength, -1.0)
+    best = strength.max(axis=1)
+    if n >= len(best):
+        return np.arange(len(best))
+    return np.sort(np.argpartition(-best, n - 1)[:n])
+
+
+def _float_values(df):
+    return df.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _average_ranks(values):
+    """Ранги значений (1..n), равным значениям — средний ранг, как в rank()"""
+    order = np.argsort(values)
+    ordered = values[order]
+    starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+    counts = np.diff(np.r_[starts, len(values)])
+    group_ranks = starts + (counts + 1) / 2.0
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[order] = np.repeat(group_ranks, counts)
+    return ranks
+
+
+def _pearson(values):
+    """Корреляция Пирсона колонок массива без пропусков"""
+    centered = values - values.mean(axis=0)
+    norms = np.sqrt(np.einsum('ij,ij->j', centered, centered))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Колонки без разброса дают NaN, как в pandas
+        standardized = centered / np.where(norms > 0, norms, np.nan)
+    result = standardized.T @ standardized
+    np.clip(result, -1.0, 1.0, out=result)
+    diagonal = np.where(norms > 0, 1.0, np.nan)
+    np.fill_diagonal(result, diagonal)
+    return result
@@ -1,199 +1,358 @@
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
 import logging
 import io
-import matplotlib.pyplot as plt
-import seaborn as sns
 import os
-import tempfile
+import mmap
 import base64
+import functools
+import math
 from io import BytesIO
+from models.fill_ratio import FillRatioEngine
+from models.column_validator import ColumnCountValidator, MappedReader
+from models.dialect import DialectSniffer
+from models.streaming_stats import ChunkedStats
+from models.analysis_cache import AnalysisCache, cached_result
+from models.memory_optimizer import MemoryOptimizer, format_bytes
+from models.deduplication import RowDeduplicator
+from models.preprocessing_pipeline import PreprocessingPipeline, PreprocessingStep
+from models.preprocessing_model import PreprocessingModel, sparse_positions, to_dense
+from models.column_stats import (ColumnStatsEngine, counts_summary, format_summary, summary_notes,
+                                 unique_summary, value_counts, value_counts_summary)
+from models.correlation import CorrelationEngine
+from models.sketches import ApproximateStats
+from models.plot_renderer import PlotRenderer, plot_specs
+from models.density import DensityEngine
+from models.box_stats import BoxStatsStore
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    pq = None
+    feather = None
+
+# Колоночные бинарные форматы (читаются и пишутся через pyarrow)
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.ipc')
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + ARROW_EXTENSIONS
 
 class DataModel:
     def __init__(self):
         self.df = None
         self.zero_values = ['', ' ', '-', 'NA', 'N/A', 'null', 'NULL', 'NaN', 'nan']
+        self.column_fill_ratios = None
+        self.max_invalid_rows = 100
+        # Размер блока (в строках) для потоковой загрузки; None — загрузка целиком
+        self.chunk_size = None
+        # Колонки для чтения из Parquet/Feather (None — все) и сжатие при сохранении
+        self.load_columns = None
+        self.columnar_compression = 'zstd'
+        self.chunked_stats = None
+        # Сжатие типов после загрузки (category, уменьшение разрядности, строки Arrow)
+        self.optimize_memory = False
+        self.memory_optimizer = MemoryOptimizer()
+        self.memory_report = None
+        # Число замен нулевых значений на NaN по колонкам (последняя предобработка)
+        self.null_replacements = None
+        # Удаление дубликатов: сверка совпавших отпечатков и порог выгрузки отпечатков на диск
+        self.dedup_verify = True
+        self.dedup_spill_rows = 5_000_000
+        self.duplicate_report = None
+        # Значения, которыми заполнены пропуски при последней предобработке (imputer.fill_values)
+        self.imputer = None
+        # Обученные параметры предобработки (сохраняются и применяются к новым файлам)
+        self.preprocessing_model = PreprocessingModel()
+        self._preprocess_options = None
+        # Предобработка поверх исходного датасета. Запоминается только очищенный
+        # датасет (после заполнения пропусков): смена нормализации или кодирования
+        # не повторяет очистку, а промежуточные копии данных не хранятся
+        self.pipeline = PreprocessingPipeline([
+            PreprocessingStep('Замена нулевых значений', self._normalize_nulls_step, ['zero_values']),
+            PreprocessingStep('Удаление дубликатов', self._drop_duplicates_step),
+            PreprocessingStep('Заполнение пропусков', self._impute_step, memoize=True),
+            PreprocessingStep('Нормализация', self._scale_step, ['normalize']),
+            PreprocessingStep('Кодирование', self._encode_step,
+                              ['encoding_type', 'max_categories', 'other_bucket']),
+        ])
+        # Параллельный расчёт статистик по колонкам (число потоков: None — по числу ядер)
+        self.stats_engine = ColumnStatsEngine()
+        # Корреляции Пирсона и Спирмена (матрицы запоминаются в результатах анализа)
+        self.correlation_engine = CorrelationEngine()
+        # Отрисовка графиков в пуле процессов (вкладка графиков и экспорт в HTML)
+        self.plot_renderer = PlotRenderer()
+        # Гистограммы и кривые плотности графиков (запоминаются по колонкам)
+        self.density_engine = DensityEngine()
+        # Квартили, усы и выбросы колонок: общие для describe, бокс-плотов и экспорта
+        self.box_stats = BoxStatsStore()
+        # Приближённые статистики по скетчам (HyperLogLog, Count-Min, KLL) и их погрешность
+        self.approximate_stats = False
+        self.approximate_error = 0.01
+        self._sketches = None
+        # Число выводимых значений на вкладках уникальных значений и частот;
+        # полный список отдаётся страницами по page_size значений
+        self.top_n = 20
+        self.page_size = 1000
+        self._page_source = None
+        # Определение диалекта текстовых файлов (кэшируется для каждого файла)
+        self.sniffer = DialectSniffer()
+        # Дисковый кэш разобранных датасетов и статистик
+        self.cache = AnalysisCache()
+        self.use_cache = True
+        self._load_key = None
+        self._stats_key = None
+        # Рассчитанные статистики текущих данных
+        self._results = {}
         
-    def load_data(self, file_name):
+    def load_data(self, file_name, progress_callback=None):
         """Загрузка данных из файла"""
         try:
             self.current_file = file_name
+            # Прежний датасет (возможно, уже предобработанный) не должен
+            # остаться, если загрузка не удастся: иначе повторная
+            # предобработка приняла бы его за исходный
+            self.df = None
+            self.chunked_stats = None
+            self.column_fill_ratios = None
+            self.memory_report = None
+            self.null_replacements = None
+            self.imputer = None
+            self.pipeline.reset()
+            self.preprocessing_model = PreprocessingModel()
+            self._preprocess_options = None
+            self.duplicate_report = None
+            self._load_key = None
+            self._stats_key = None
+            self._results = {}
+            self._sketches = None
+            self._page_source = None
+            self.density_engine.reset()
+            self.box_stats.reset()
             logging.info(f"Начинаем загрузку файла: {file_name}")
             
-            # Определяем разделитель на основе расширения файла
-            if file_name.endswith('.tsv'):
-                sep = '\t'
-            elif file_name.endswith('.txt'):
-                # Читаем первую строку для определения разделителя
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    first_line = f.readline().strip()
-                sep = self._detect_separator(first_line)
-                if sep is None:
-                    raise ValueError("Не удалось определить разделитель в файле")
-            else:
-                sep = None
+            # Колоночные форматы уже быстрые: читаем напрямую, без кэша и проверки строк
+            if file_name.endswith(COLUMNAR_EXTENSIONS):
+                return self._load_columnar(file_name, progress_callback)
             
-            # Сначала пробуем прочитать файл как CSV с кавычками
-            try:
-                if file_name.endswith('.csv'):
-                    self.df = pd.read_csv(file_name, 
-                                        quoting=1,  # QUOTE_ALL
-                                        encoding='utf-8',
-                                        skipinitialspace=True)
-                elif file_name.endswith(('.xlsx', '.xls', '.xlsm', '.xlsb')):
-                    self.df = pd.read_excel(file_name)
-                    # Для Excel файлов пропускаем проверку количества колонок
-                    logging.info(f"DataFrame создан, размер: {self.df.shape}")
-                    
-                    # Проверяем заполненность данных
-                    total_cells = self.df.size
-                    non_empty_cells = sum(
-                        sum(1 for x in self.df[col] if pd.notna(x) and str(x).strip() not in self.zero_values)
-                        for col in self.df.columns
-                    )
-                    fill_ratio = (non_empty_cells / total_cells) * 100
-                    logging.info(f"Заполненность данных: {fill_ratio:.2f}%")
-                    
-                    if fill_ratio < 50:
-                        raise ValueError("В файле слишком много пустых значений")
-                    
+            if file_name.endswith(('.xlsx', '.xls', '.xlsm', '.xlsb')):
+                if self._load_from_cache(file_name):
                     return True
-                elif file_name.endswith('.tsv'):
-                    self.df = pd.read_csv(file_name, sep='\t', encoding='utf-8')
-                else:
-                    self.df = pd.read_csv(file_name, sep=sep, encoding='utf-8')
-                
+                self.df = pd.read_excel(file_name)
+                # Для Excel файлов пропускаем проверку количества колонок
                 logging.info(f"DataFrame создан, размер: {self.df.shape}")
                 
-                # Сначала проверяем заполненность данных
-                total_cells = self.df.size
-                # Считаем только непустые значения (не NaN, не пустая строка, не пробел)
-                non_empty_cells = sum(
-                    sum(1 for x in self.df[col] if pd.notna(x) and str(x).strip() not in self.zero_values)
-                    for col in self.df.columns
-                )
-                fill_ratio = (non_empty_cells / total_cells) * 100
-                logging.info(f"Заполненность данных: {fill_ratio:.2f}%")
+                # Проверяем заполненность данных
+                self._check_fill_ratio()
                 
-                if fill_ratio < 50:
-                    raise ValueError("В файле слишком много пустых значений")
+                self._optimize_loaded_frame()
+                return self._cache_loaded_frame()
                 
-                # Затем проверяем количество колонок
-                expected_cols = len(self.df.columns)
-                
-                # Читаем файл как текст для проверки
-                with open(file_name, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                # Проверяем каждую строку
-                invalid_rows = []
-                for i, line in enumerate(lines[1:], 1):
-                    # Используем csv.reader для корректной обработки кавычек
-                    import csv
-                    from io import StringIO
-                    reader = csv.reader(StringIO(line), delimiter=sep if sep else ',')
-                    values = next(reader)
-                    actual_cols = len(values)
-                    
-                    if actual_cols != expected_cols:
-                        invalid_rows.append(i + 1)
-                        logging.warning(f"Строка {i + 1}: ожидалось {expected_cols} колонок, найдено {actual_cols}")
-                
-                # Если найдены строки с неправильным количеством колонок, отклоняем файл
-                if invalid_rows:
-                    error_msg = f"Файл содержит строки с неправильным количеством колонок: {invalid_rows}"
-                    logging.error(error_msg)
-                    raise ValueError(error_msg)
-                
-                return True
-                
-            except pd.errors.ParserError as e:
-                # Если не удалось прочитать с кавычками, пробуем без них
-                logging.warning(f"Ошибка при чтении CSV с кавычками: {str(e)}")
-                if file_name.endswith('.csv'):
-                    self.df = pd.read_csv(file_name, 
-                                        encoding='utf-8',
-                                        skipinitialspace=True)
-                    
-                    logging.info(f"DataFrame создан, размер: {self.df.shape}")
-                    
-                    # Сначала проверяем заполненность данных
-                    total_cells = self.df.size
-                    # Считаем только непустые значения (не NaN, не пустая строка, не пробел)
-                    non_empty_cells = sum(
-                        sum(1 for x in self.df[col] if pd.notna(x) and str(x).strip() not in self.zero_values)
-                        for col in self.df.columns
-                    )
-                    fill_ratio = (non_empty_cells / total_cells) * 100
-                    logging.info(f"Заполненность данных: {fill_ratio:.2f}%")
-                    
-                    if fill_ratio < 50:
-                        raise ValueError("В файле слишком много пустых значений")
-                    
-                    # Затем проверяем количество колонок
-                    expected_cols = len(self.df.columns)
-                    
-                    # Читаем файл как текст для проверки
-                    with open(file_name, 'r', encoding='utf-8') as f:
-                        lines = f.readlines()
-                    
-                    # Проверяем каждую строку
-                    invalid_rows = []
-                    for i, line in enumerate(lines[1:], 1):
-                        values = [v.strip() for v in line.strip().split(',')]
-                        # Удаляем пустые значения в конце
-                        while values and not values[-1]:
-                            values.pop()
-                        actual_cols = len(values)
-                        
-                        if actual_cols != expected_cols:
-                            invalid_rows.append(i + 1)
-                            logging.warning(f"Строка {i + 1}: ожидалось {expected_cols} колонок, найдено {actual_cols}")
-                    
-                    # Если найдены строки с неправильным количеством колонок, отклоняем файл
-                    if invalid_rows:
-                        error_msg = f"Файл содержит строки с неправильным количеством колонок: {invalid_rows}"
-                        logging.error(error_msg)
-                        raise ValueError(error_msg)
-                    
-                    return True
+            # Текстовые таблицы (CSV, TSV, TXT) читаются через отображение файла в память
+            return self._load_mapped(file_name, progress_callback)
             
-        except Exception as e:
-            logging.error(f"Ошибка при загрузке файла: {str(e)}")
+        except BaseException as e:
+            # Отклонённый или недочитанный файл (ошибка, отмена) не считается загруженным
+            self.df = None
+            self.chunked_stats = None
+            if isinstance(e, Exception):
+                logging.error(f"Ошибка при загрузке файла: {str(e)}")
             raise
     
     
-    def _detect_separator(self, first_line):
-        """Определение разделителя в файле"""
-        separators = {
-            '\t': '\t',
-            '~': '~',
-            '#': '#',
-            ',': ',',
-            ';': ';',
-            ' ': ' '
-        }
-        
-        # Сначала проверяем на табуляцию
-        if '\t' in first_line:
-            return '\t'
-            
-        # Проверяем каждый разделитель
-        for sep, pattern in separators.items():
-            if sep in first_line:
-                # Проверяем, что разделитель действительно разделяет значения
-                parts = first_line.split(sep)
-                if len(parts) > 1 and all(part.strip() for part in parts):
-                    return pattern
-        
-        # Если разделитель не найден, пробуем определить по количеству колонок
-        for sep, pattern in separators.items():
-            parts = first_line.split(sep)
-            if len(parts) > 1:
-                return pattern
+    def _load_from_cache(self, file_name):
+        """Загрузка разобранного датасета из дискового кэша"""
+        if not self.use_cache:
+            return False
+        try:
+            file_key = self.cache.file_key(file_name)
+        except OSError:
+            return False
+        self._load_key = self.cache.make_key(file_key, stage='load', zero_values=self.zero_values,
+                                             optimize_memory=self.optimize_memory)
+        
+        df = self.cache.load_frame(self._load_key)
+        if df is None:
+            return False
+        self.df = df
+        stats = self.cache.load_stats(self._load_key)
+        self.column_fill_ratios = stats.get('column_fill_ratios')
+        self.memory_report = stats.get('memory_report')
+        logging.info(f"Датасет загружен из кэша, размер: {self.df.shape}")
+        return True
+    
+    def _cache_loaded_frame(self):
+        """Сохранение разобранного датасета в дисковый кэш"""
+        if self._load_key is not None:
+            self.cache.save_frame(self._load_key, self.df,
+                                  {'column_fill_ratios': self.column_fill_ratios,
+                                   'memory_report': self.memory_report})
+        return True
+        
+    def _optimize_loaded_frame(self):
+        """Сжатие типов загруженного датасета (если включено)"""
+        if self.optimize_memory and self.df is not None:
+            self.memory_report = self.memory_optimizer.optimize(self.df)
+    
+    def _store_result(self, name, value):
+        """Запоминание рассчитанной статистики (и сохранение в кэш)"""
+        self._results[name] = value
+        if self._stats_key is not None:
+            self.cache.save_stats(self._stats_key, {name: value})
+    
+    def _collect_chunked_stats(self, chunks, progress, progress_callback=None):
+        """Накопление статистик по блокам и проверка заполненности"""
+        fill_engine = FillRatioEngine(self.zero_values)
+        sketches = ApproximateStats(self.approximate_error) if self.approximate_stats else None
+        stats = ChunkedStats(sketches=sketches, error=self.approximate_error)
+        for chunk in chunks:
+            stats.update(chunk, fill_engine.count_filled(chunk))
+            if progress_callback:
+                progress_callback(progress(stats), f"Обработано строк: {stats.rows}")
+        logging.info(f"Обработано {stats.chunks} блоков, размер: ({stats.rows}, {len(stats.columns or [])})")
+        
+        fill_ratio = stats.fill_ratio()
+        self.column_fill_ratios = stats.filled / max(stats.rows, 1) * 100
+        logging.info(f"Заполненность данных: {fill_ratio:.2f}%")
+        if fill_ratio < 50:
+            raise ValueError("В файле слишком много пустых значений")
+        return stats
+        
+    def _load_mapped(self, file_name, progress_callback=None):
+        """Загрузка текстовой таблицы через отображение файла в память (mmap).
+        
+        Файл отображается один раз: диалект (разделитель, кавычки, кодировка)
+        определяется по выборкам из отображения, затем валидатор проверяет количество колонок прямо в
+        отображённых байтах (до разбора — испорченный файл отклоняется сразу),
+        а pandas читает из того же буфера. Страницы отображения принадлежат
+        кэшу ОС, поэтому пиковое потребление памяти близко к размеру DataFrame.
+        """
+        if not self.chunk_size and self._load_from_cache(file_name):
+            return True
+        
+        with open(file_name, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                raise ValueError("Файл пуст")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                default_sep = {'.tsv': '\t', '.csv': ','}.get(os.path.splitext(file_name)[1].lower())
+                dialect = self.sniffer.sniff(file_name, mapped, default_sep)
+                if dialect.delimiter is None:
+                    raise ValueError("Не удалось определить разделитель в файле")
+                read_kwargs = {
+                    'sep': dialect.delimiter,
+                    'quotechar': dialect.quotechar,
+                    'encoding': dialect.encoding,
+                    'skipinitialspace': dialect.skipinitialspace,
+                }
+                
+                validator = self._make_validator(**read_kwargs)
+                validator.feed_buffer(mapped, progress_callback=(
+                    lambda fraction: progress_callback(fraction / 2, "Проверка структуры файла"))
+                    if progress_callback else None)
+                validator.close()
+                self._check_column_counts(validator)
                 
-        return None
+                reader = MappedReader(mapped)
+                try:
+                    stream = io.BufferedReader(reader)
+                    if self.chunk_size:
+                        logging.info(f"Потоковая загрузка блоками по {self.chunk_size} строк")
+                        with pd.read_csv(stream, chunksize=self.chunk_size, **read_kwargs) as chunks:
+                            stats = self._collect_chunked_stats(
+                                chunks, lambda stats: 0.5 + reader.position / size / 2,
+                                progress_callback)
+                    else:
+                        self.df = pd.read_csv(stream, **read_kwargs)
+                finally:
+                    reader.close()
+        
+        if self.chunk_size:
+            self._check_header_columns(validator, len(stats.columns or []))
+            self.df = None
+            self.chunked_stats = stats
+            return True
+        
+        logging.info(f"DataFrame создан, размер: {self.df.shape}")
+        self._check_header_columns(validator, len(self.df.columns))
+        if progress_callback:
+            progress_callback(1.0, "Чтение файла")
+        self._check_fill_ratio()
+        self._optimize_loaded_frame()
+        return self._cache_loaded_frame()
+    
+    def _load_columnar(self, file_name, progress_callback=None):
+        """Загрузка Parquet / Feather / Arrow IPC с выбором колонок.
+
+        Feather и Arrow IPC читаются через отображение файла в память;
+        в потоковом режиме таблица обходится блоками по chunk_size строк.
+        """
+        if pq is None:
+            raise ValueError("Для работы с форматами Parquet/Feather/Arrow требуется пакет pyarrow")
+        columns = list(self.load_columns) if self.load_columns else None
+        
+        if self.chunk_size:
+            if file_name.endswith(PARQUET_EXTENSIONS):
+                parquet_file = pq.ParquetFile(file_name, memory_map=True)
+                total_rows = parquet_file.metadata.num_rows
+                batches = parquet_file.iter_batches(batch_size=self.chunk_size, columns=columns)
+            else:
+                table = feather.read_table(file_name, columns=columns, memory_map=True)
+                total_rows = table.num_rows
+                batches = table.to_batches(max_chunksize=self.chunk_size)
+            logging.info(f"Потоковая загрузка блоками по {self.chunk_size} строк")
+            chunks = (batch.to_pandas() for batch in batches)
+            self.chunked_stats = self._collect_chunked_stats(
+                chunks, lambda stats: stats.rows / max(total_rows, 1), progress_callback)
+            self.df = None
+            return True
+        
+        if file_name.endswith(PARQUET_EXTENSIONS):
+            table = pq.read_table(file_name, columns=columns, memory_map=True)
+        else:
+            table = feather.read_table(file_name, columns=columns, memory_map=True)
+        self.df = table.to_pandas()
+        logging.info(f"DataFrame создан, размер: {self.df.shape}")
+        if progress_callback:
+            progress_callback(1.0, "Чтение файла")
+        
+        self._check_fill_ratio()
+        self._optimize_loaded_frame()
+        return True
+    
+    def _make_validator(self, sep, **read_kwargs):
+        """Создание валидатора под параметры чтения pandas"""
+        return ColumnCountValidator(
+            delimiter=sep,
+            quotechar=read_kwargs.get('quotechar', '"'),
+            encoding=read_kwargs.get('encoding', 'utf-8'),
+            max_bad_rows=self.max_invalid_rows,
+            skipinitialspace=read_kwargs.get('skipinitialspace', False))
+    
+    def _check_header_columns(self, validator, n_columns):
+        """Сверка числа колонок заголовка (по валидатору) с разобранными данными"""
+        if validator.expected_cols is not None and validator.expected_cols != n_columns:
+            logging.warning(f"Заголовок содержит {validator.expected_cols} колонок, "
+                            f"DataFrame — {n_columns}")
+        
+    def _check_column_counts(self, validator):
+        """Отклонение файла со строками неправильной длины"""
+        # Если найдены строки с неправильным количеством колонок, отклоняем файл
+        if validator.invalid_rows:
+            error_msg = f"Файл содержит строки с неправильным количеством колонок: {validator.invalid_rows}"
+            if validator.truncated:
+                error_msg += f" (показаны первые {validator.max_bad_rows})"
+            logging.error(error_msg)
+            raise ValueError(error_msg)
+    
+    def _check_fill_ratio(self):
+        """Проверка заполненности данных (общей и по колонкам)"""
+        total_ratio, self.column_fill_ratios = FillRatioEngine(self.zero_values).compute(self.df)
+        logging.info(f"Заполненность данных: {total_ratio:.2f}%")
+        
+        if total_ratio < 50:
+            raise ValueError("В файле слишком много пустых значений")
     
     def _validate_data(self):
         """Валидация загруженных данных"""
@@ -211,134 +370,402 @@ class DataModel:
             
         return True
     
-    def preprocess_data(self, normalize=False, encoding_type='Без кодирования'):
-        """Предобработка данных"""
+    def has_data(self):
+        """Загружены ли данные (целиком или в потоковом режиме)"""
+        return self.df is not None or self.chunked_stats is not None
+    
+    def get_shape(self):
+        """Размерность датасета"""
+        if self.chunked_stats is not None:
+            return (self.chunked_stats.rows, len(self.chunked_stats.columns))
+        return self.df.shape
+    
+    def get_numeric_data(self):
+        """Числовые колонки для графиков (в потоковом режиме — выборка строк)"""
+        if self.chunked_stats is not None:
+            return self.chunked_stats.sample_frame()
+        return to_dense(self.df.select_dtypes(include=['number']))
+    
+    def preprocess_data(self, normalize=False, encoding_type='Без кодирования', max_categories=10,
+                        other_bucket=False):
+        """Предобработка данных.
+        
+        max_categories — предел числа категорий для one-hot кодирования;
+        при other_bucket колонки с большим числом категорий кодируются
+        по top-K (K = max_categories) с колонкой «Прочее».
+        """
+        if self.chunked_stats is not None:
+            logging.info("Потоковый режим: предобработка не выполняется")
+            return
         if self.df is None:
             return
+        
+        # Исходный датасет сохраняется: повторная предобработка с другими
+        # параметрами начинается с него, а не с уже обработанных данных
+        if self.pipeline.raw is None:
+            self.pipeline.set_raw(self.df)
+        
+        # Предобработанный датасет и его статистики могут быть в кэше.
+        # Ключ строится от исходного файла, поэтому используется только
+        # для первой предобработки после загрузки.
+        self._results = {}
+        self._sketches = None
+        self._page_source = None
+        self.density_engine.reset()
+        self.box_stats.reset()
+        self._stats_key = None
+        self._preprocess_options = {'zero_values': self.zero_values, 'normalize': normalize,
+                                    'encoding_type': encoding_type, 'max_categories': max_categories,
+                                    'other_bucket': other_bucket}
+        if self._load_key is not None:
+            self._stats_key = self.cache.make_key(self._load_key, normalize=normalize,
+                                                  encoding_type=encoding_type,
+                                                  max_categories=max_categories,
+                                                  other_bucket=other_bucket,
+                                                  approximate_stats=self.approximate_stats,
+                                                  approximate_error=self.approximate_error)
+            self._load_key = None
+            # Отчёты шагов (замены нулей, дубликаты, заполнение пропусков)
+            # хранятся вместе с датасетом; запись без них считается заново
+            stats = self.cache.load_stats(self._stats_key)
+            state = stats.pop('preprocess_state', None)
+            cached = self.cache.load_frame(self._stats_key) if state is not None else None
+            if cached is not None:
+                self.df = cached
+                self.null_replacements, self.duplicate_report, self.imputer = state
+                self._results = stats
+                logging.info("Предобработанный датасет и статистики загружены из кэша")
+                return
             
-        # Очистка данных
-        for col in self.df.columns:
-            # Заменяем нулевые значения на NaN для последующей обработки
-            self.df[col] = self.df[col].replace(self.zero_values, np.nan)
-        
-        # Удаление дубликатов
-        initial_shape = self.df.shape
-        self.df = self.df.drop_duplicates()
-        logging.info(f"Удалено {initial_shape[0] - self.df.shape[0]} дублирующихся строк")
-        
-        # Заполнение пропущенных значений
-        for col in self.df.columns:
-            if self.df[col].isnull().sum() > 0:
-                if pd.api.types.is_numeric_dtype(self.df[col]):
-                    # Для числовых признаков используем медиану
-                    median_val = self.df[col].median()
-                    self.df[col] = self.df[col].fillna(median_val)
-                    logging.info(f"Заполнены пропуски в числовом признаке {col} медианой: {median_val}")
+        self.df = self.pipeline.run(**self._preprocess_options)
+        
+        if self._stats_key is not None:
+            state = (self.null_replacements, self.duplicate_report, self.imputer)
+            self.cache.save_frame(self._stats_key, self.df, stats={'preprocess_state': state})
+        
+    def _normalize_nulls_step(self, df, zero_values):
+        """Очистка данных: заменяем нулевые значения на NaN для последующей обработки"""
+        df = self.preprocessing_model.fit_nulls(df, zero_values)
+        self.null_replacements = self.preprocessing_model.null_replacements
+        return df
+        
+    def _drop_duplicates_step(self, df):
+        """Удаление дубликатов по 64-битным отпечаткам строк"""
+        deduplicator = RowDeduplicator(verify=self.dedup_verify, spill_rows=self.dedup_spill_rows)
+        result, self.duplicate_report = deduplicator.drop_duplicates(df)
+        return result
+        
+    def _impute_step(self, df):
+        """Заполнение пропущенных значений (медиана для чисел, мода для остальных)"""
+        df = self.preprocessing_model.fit_imputer(df)
+        self.imputer = self.preprocessing_model.imputer
+        return df
+        
+    def _scale_step(self, df, normalize):
+        """Нормализация"""
+        return self.preprocessing_model.fit_scaler(df, normalize)
+        
+    def _encode_step(self, df, encoding_type, max_categories, other_bucket):
+        """Кодирование"""
+        return self.preprocessing_model.fit_encoder(df, encoding_type, max_categories, other_bucket)
+        
+    def save_preprocessing_model(self, file_name):
+        """Сохранение обученной модели предобработки"""
+        if self._preprocess_options is None:
+            raise ValueError("Предобработка ещё не выполнялась")
+        if not self.preprocessing_model.fitted:
+            # Предобработанный датасет взят из кэша: параметры обучаются заново
+            self.pipeline.run(**self._preprocess_options)
+        self.preprocessing_model.save(file_name)
+        return True
+        
+    def apply_preprocessing_model(self, model_file, input_file, output_file, progress_callback=None):
+        """Применение сохранённой модели к новому файлу блоками, без повторного обучения.
+        
+        Входной файл читается по chunk_size строк (или по 100 000, если
+        потоковый режим выключен), каждый блок преобразуется моделью и
+        дописывается в выходной файл. Удаление дубликатов к новым
+        данным не применяется.
+        """
+        model = PreprocessingModel.load(model_file)
+        if output_file.endswith(('.xls', '.xlsx')):
+            raise ValueError("Поблочная запись в Excel не поддерживается, выберите CSV, TSV или Parquet")
+        if output_file.endswith(COLUMNAR_EXTENSIONS) and pq is None:
+            raise ValueError("Для работы с форматами Parquet/Feather/Arrow требуется пакет pyarrow")
+        
+        sep = ',' if output_file.endswith('.csv') else '\t'
+        rows = 0
+        writer = None
+        try:
+            for chunk, fraction in self._read_chunks(input_file, self.chunk_size or 100_000):
+                result = model.transform(chunk)
+                if output_file.endswith(COLUMNAR_EXTENSIONS):
+                    table = pa.Table.from_pandas(to_dense(result), preserve_index=False)
+                    if writer is None:
+                        schema = table.schema
+                        writer = self._open_columnar_writer(output_file, schema)
+                    # Типы блоков могут расходиться (например, колонка без значений в блоке)
+                    writer.write_table(table.cast(schema))
                 else:
-                    # Для категориальных признаков используем моду
-                    mode_val = self.df[col].mode().iloc[0]
-                    self.df[col] = self.df[col].fillna(mode_val)
-                    logging.info(f"Заполнены пропуски в категориальном признаке {col} модой: {mode_val}")
-        
-        # Нормализация
-        if normalize:
-            numeric_cols = self.df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) > 0:
-                scaler = StandardScaler()
-                self.df[numeric_cols] = scaler.fit_transform(self.df[numeric_cols])
-                logging.info("Данные нормализованы с помощью StandardScaler")
-        
-        # Кодирование
-        if encoding_type != 'Без кодирования':
-            categorical_cols = self.df.select_dtypes(include=['object']).columns
-            if encoding_type == 'Числовое кодирование':
-                for col in categorical_cols:
-                    self.df[col] = pd.Categorical(self.df[col]).codes
-                logging.info("Применено числовое кодирование")
-            elif encoding_type == 'One-Hot кодирование':
-                valid_cols = [col for col in categorical_cols if self.df[col].nunique() <= 10]
-                if valid_cols:
-                    # Преобразуем в числовые 1/0 вместо True/False
-                    self.df = pd.get_dummies(self.df, columns=valid_cols).astype(int)
-                    logging.info(f"Применено one-hot кодирование к колонкам: {valid_cols}")
+                    # Заголовок пишется только с первым блоком
+                    result.to_csv(output_file, sep=sep, index=False, na_rep='',
+                                  header=rows == 0, mode='w' if rows == 0 else 'a')
+                rows += len(result)
+                if progress_callback:
+                    progress_callback(fraction, f"Обработано строк: {rows}")
+        finally:
+            if writer is not None:
+                writer.close()
+        logging.info(f"Модель предобработки применена к {input_file}: {rows} строк сохранено в {output_file}")
+        return rows
+        
+    def _read_chunks(self, file_name, chunk_size):
+        """Блоки входного файла и доля прочитанного"""
+        if file_name.endswith(COLUMNAR_EXTENSIONS):
+            if pq is None:
+                raise ValueError("Для работы с форматами Parquet/Feather/Arrow требуется пакет pyarrow")
+            if file_name.endswith(PARQUET_EXTENSIONS):
+                parquet_file = pq.ParquetFile(file_name, memory_map=True)
+                total_rows = parquet_file.metadata.num_rows
+                batches = parquet_file.iter_batches(batch_size=chunk_size)
+            else:
+                table = feather.read_table(file_name, memory_map=True)
+                total_rows = table.num_rows
+                batches = table.to_batches(max_chunksize=chunk_size)
+            rows = 0
+            for batch in batches:
+                rows += batch.num_rows
+                yield batch.to_pandas(), rows / max(total_rows, 1)
+            return
+        
+        if file_name.endswith(('.xlsx', '.xls', '.xlsm', '.xlsb')):
+            yield pd.read_excel(file_name), 1.0
+            return
+        
+        size = os.path.getsize(file_name)
+        if size == 0:
+            raise ValueError("Файл пуст")
+        default_sep = {'.tsv': '\t', '.csv': ','}.get(os.path.splitext(file_name)[1].lower())
+        dialect = self.sniffer.sniff(file_name, default_delimiter=default_sep)
+        if dialect.delimiter is None:
+            raise ValueError("Не удалось определить разделитель в файле")
+        with open(file_name, 'rb') as f:
+            with pd.read_csv(f, chunksize=chunk_size, sep=dialect.delimiter,
+                             quotechar=dialect.quotechar, encoding=dialect.encoding,
+                             skipinitialspace=dialect.skipinitialspace) as chunks:
+                for chunk in chunks:
+                    yield chunk, f.tell() / size
+                    
+    def _open_columnar_writer(self, file_name, schema):
+        """Писатель Parquet или Arrow IPC для поблочной записи"""
+        if file_name.endswith(PARQUET_EXTENSIONS):
+            return pq.ParquetWriter(file_name, schema, compression=self.columnar_compression or 'none')
+        options = pa.ipc.IpcWriteOptions(compression=self.columnar_compression)
+        return pa.ipc.new_file(file_name, schema, options=options)
 
+    @cached_result('info')
     def get_data_info(self):
         """Получение информации о данных, включая форму (shape)"""
-        if self.df is None:
+        if not self.has_data():
             return None
 
         buffer = io.StringIO()
 
         # Сначала записываем info()
-        self.df.info(buf=buffer)
+        if self.chunked_stats is not None:
+            buffer.write(self.chunked_stats.info())
+        else:
+            # Для разреженных колонок pandas не считает число непустых значений
+            self.df.info(buf=buffer, show_counts=not sparse_positions(self.df))
 
         # Затем добавляем shape — тоже записываем в buffer
-        shape_str = f"\nРазмерность: {self.df.shape[0]} строк × {self.df.shape[1]} столбцов\n"
+        rows, cols = self.get_shape()
+        shape_str = f"\nРазмерность: {rows} строк × {cols} столбцов\n"
         buffer.write(shape_str)
+        
+        if self.memory_report is not None:
+            report = self.memory_report
+            saved = (1 - report.after / report.before) * 100 if report.before else 0
+            buffer.write(f"Память после загрузки: {format_bytes(report.before)} → "
+                         f"{format_bytes(report.after)} (−{saved:.0f}%), "
+                         f"изменены типы {len(report.changed)} колонок\n")
+        
+        if self.duplicate_report is not None and self.duplicate_report.removed:
+            groups = self.duplicate_report.groups
+            buffer.write(f"Удалено дубликатов: {self.duplicate_report.removed} "
+                         f"(групп: {len(groups)}, наибольшая: {groups.iloc[0] + 1} копий)\n")
 
         return buffer.getvalue()
     
     
+    @cached_result('describe_box_stats')
     def get_data_describe(self):
         """Получение статистического описания данных"""
-        if self.df is None:
+        sketches = self._approximate()
+        if self.chunked_stats is not None:
+            describe_df = self.chunked_stats.describe()
+        elif self.df is None:
             return None
-        return self.df.describe()
+        elif sketches is None:
+            # Числовые колонки — из хранилища статистик (с усами и выбросами бокс-плота)
+            numeric_df = to_dense(self.df.select_dtypes(include=[np.number]))
+            if numeric_df.empty or self.df.select_dtypes(include=['datetime', 'datetimetz']).shape[1]:
+                return self.stats_engine.describe(self.df)
+            return self.box_stats.describe(numeric_df, self.stats_engine)
+        else:
+            # Точные count, mean, std, min, max — без сортировки колонок
+            numeric_df = to_dense(self.df.select_dtypes(include=[np.number]))
+            if numeric_df.empty:
+                return self.stats_engine.describe(self.df)
+            describe_df = pd.DataFrame({'count': numeric_df.count(), 'mean': numeric_df.mean(),
+                                        'std': numeric_df.std(), 'min': numeric_df.min(),
+                                        'max': numeric_df.max()}).T
+        if sketches is None or describe_df.empty:
+            return describe_df
+        return sketches.describe(describe_df)
     
+    @cached_result('correlations')
     def get_correlations(self):
         """Получение корреляций"""
+        if self.chunked_stats is not None:
+            return self.chunked_stats.correlations()
         if self.df is None:
             return None, None
             
-        numeric_df = self.df.select_dtypes(include=[np.number])
+        numeric_df = to_dense(self.df.select_dtypes(include=[np.number]))
         if numeric_df.empty:
             return None, None
             
-        pearson_corr = numeric_df.corr()
-        spearman_corr = numeric_df.corr(method='spearman')
+        pearson_corr = self.correlation_engine.pearson(numeric_df)
+        spearman_corr = self.correlation_engine.spearman(numeric_df)
         return pearson_corr, spearman_corr
     
+    @cached_result(lambda self: f'unique_values_top{self.top_n}')
     def get_unique_values(self) -> dict:
-        """Уникальные значения по каждому столбцу (все элементы без усечения)"""
-        if self.df is None:
+        """Сводки уникальных значений по столбцам: число значений и первые top_n (ValueSummary)"""
+        if not self.has_data():
             return None
 
-        result = {}
-        with pd.option_context('display.max_rows', None):
-            for col in self.df.columns:
-                # Оборачиваем в Series, чтобы использовать to_string()
-                uniques = pd.Series(self.df[col].unique())
-                result[col] = uniques.to_string(index=False)
-        return result
+        sketches = self._approximate()
+        if sketches is not None:
+            return {col: sketches.unique_summary(col, self.top_n) for col in self._column_names()}
+        if self.chunked_stats is not None:
+            result = {}
+            for col in self._column_names():
+                summary = self._chunked_summary(col)
+                result[col] = summary._replace(top=pd.Series(summary.top.index))
+            return result
+        summaries = self.stats_engine.map(functools.partial(unique_summary, top_n=self.top_n), self.df)
+        return dict(zip(self.df.columns, summaries))
     
+    @cached_result(lambda self: f'value_counts_top{self.top_n}')
     def get_value_counts(self):
-        """Получение частот значений (все строки без обрезки)"""
-        if self.df is None:
+        """Сводки частот значений по столбцам: число значений и top_n самых частых (ValueSummary)"""
+        if not self.has_data():
             return None
 
-        result: Dict[str, str] = {}
-        # временно снимаем ограничение на число строк при выводе
-        with pd.option_context('display.max_rows', None):
-            for col in self.df.columns:
-                counts: pd.Series = self.df[col].value_counts(dropna=False)
-                # .to_string() вернёт строку в том же формате,
-                # что и counts, но со всеми строками
-                result[col] = counts.to_string()
-
-        return result
+        sketches = self._approximate()
+        if sketches is not None:
+            return {col: sketches.value_counts_summary(col, self.top_n) for col in self._column_names()}
+        if self.chunked_stats is not None:
+            return {col: self._chunked_summary(col) for col in self._column_names()}
+        summaries = self.stats_engine.map(functools.partial(value_counts_summary, top_n=self.top_n), self.df)
+        return dict(zip(self.df.columns, summaries))
+        
+    def get_unique_page(self, col, page):
+        """Страница полного списка уникальных значений колонки: (значения, число страниц)"""
+        return self._page('unique', col, page)
+        
+    def get_value_counts_page(self, col, page):
+        """Страница полного списка частот колонки: (частоты, число страниц)"""
+        return self._page('value_counts', col, page)
+        
+    def get_column_names(self):
+        """Имена колонок текущих данных"""
+        return list(self._column_names())
+        
+    def _page(self, kind, col, page):
+        """Страница (с нуля) полного списка; список колонки запоминается для следующих страниц"""
+        if self._page_source is None or self._page_source[0] != (kind, col):
+            if self.chunked_stats is not None and self.chunked_stats.sketches is not None:
+                raise ValueError("Полный список недоступен: при потоковой загрузке "
+                                 "собирались только приближённые статистики")
+            values = self._value_counts(col) if kind == 'value_counts' else self._unique(col)
+            if values is None:
+                raise ValueError(f"Полный список недоступен: в колонке {col} слишком много различных "
+                                 f"значений, при потоковой загрузке собирались только приближённые частоты")
+            self._page_source = ((kind, col), pd.Series(values) if kind == 'unique' else values)
+        values = self._page_source[1]
+        pages = max(1, math.ceil(len(values) / self.page_size))
+        page = min(max(page, 0), pages - 1)
+        return values.iloc[page * self.page_size:(page + 1) * self.page_size], pages
+        
+    def _approximate(self):
+        """Скетчи приближённых статистик (None — статистики считаются точно).
+        
+        В потоковом режиме скетчи накапливаются при загрузке (если режим
+        был включён), для датасета в памяти строятся один раз по запросу.
+        """
+        if self.chunked_stats is not None:
+            return self.chunked_stats.sketches
+        if not self.approximate_stats or self.df is None:
+            return None
+        if self._sketches is None:
+            sketches = ApproximateStats(self.approximate_error)
+            sketches.update(self.df)
+            self._sketches = sketches
+            logging.info(f"Построены скетчи приближённых статистик (погрешность {self.approximate_error:.1%})")
+        return self._sketches
+    
+    def _column_names(self):
+        """Имена колонок датасета"""
+        if self.chunked_stats is not None:
+            return self.chunked_stats.columns
+        return self.df.columns
+    
+    def _unique(self, col):
+        """Уникальные значения колонки (None — точные частоты не собирались)"""
+        if self.chunked_stats is not None:
+            counts = self.chunked_stats.value_counts.counts(col)
+            return None if counts is None else counts.index
+        return self.df[col].unique()
+    
+    def _value_counts(self, col):
+        """Частоты значений колонки (None — точные частоты не собирались)"""
+        if self.chunked_stats is not None:
+            return self.chunked_stats.value_counts.counts(col)
+        return value_counts(self.df[col])
+        
+    def _chunked_summary(self, col):
+        """Сводка частот колонки потоковой загрузки: точная или по скетчу колонки"""
+        counts = self._value_counts(col)
+        if counts is None:
+            return self.chunked_stats.value_counts.sketches[col].value_counts_summary(self.top_n)
+        return counts_summary(counts, self.chunked_stats.rows, self.top_n)
+    
     def save_data(self, file_name):
         """Сохранение данных"""
+        if self.chunked_stats is not None:
+            raise ValueError("В потоковом режиме датасет не хранится в памяти и не может быть сохранён")
         if self.df is None:
             raise ValueError("Нет данных для сохранения")
             
         try:
             if file_name.endswith('.csv'):
                 # Перезаписываем пустые строки на NaN и сохраняем
-                df_to_save = self.df.replace(r'^\s*$', pd.NA, regex=True)
+                # (разреженные one-hot колонки числовые и пишутся как есть)
+                df_to_save = self.df.copy(deep=False)
+                sparse = set(sparse_positions(self.df))
+                dense = [i for i in range(self.df.shape[1]) if i not in sparse]
+                cleaned = self.df.iloc[:, dense].replace(r'^\s*$', pd.NA, regex=True)
+                for k, i in enumerate(dense):
+                    df_to_save.isetitem(i, cleaned.iloc[:, k])
                 df_to_save.to_csv(file_name, index=False, na_rep='')
             elif file_name.endswith(('.xls', '.xlsx')):
                 engine = 'openpyxl' if file_name.endswith('.xlsx') else 'xlwt'
-                self.df.to_excel(file_name, index=False, engine=engine)
+                to_dense(self.df).to_excel(file_name, index=False, engine=engine)
+            elif file_name.endswith(COLUMNAR_EXTENSIONS):
+                self._save_columnar(file_name)
             else:
                 self.df.to_csv(file_name, sep='\t', index=False)
             logging.info(f"Датасет сохранён в {file_name}")
@@ -347,81 +774,55 @@ class DataModel:
             logging.error(f"Ошибка при сохранении файла: {str(e)}")
             raise
     
-    def export_to_html(self, file_name):
-        """Экспорт данных в HTML формат"""
-        if self.df is None:
+    def _save_columnar(self, file_name):
+        """Сохранение в Parquet или Feather/Arrow IPC со сжатием"""
+        if pq is None:
+            raise ValueError("Для работы с форматами Parquet/Feather/Arrow требуется пакет pyarrow")
+        compression = self.columnar_compression or 'uncompressed'
+        # pyarrow не поддерживает разреженные колонки pandas
+        df = to_dense(self.df)
+        if file_name.endswith(PARQUET_EXTENSIONS):
+            df.to_parquet(file_name, index=False, compression=self.columnar_compression)
+        else:
+            # Feather хранит только RangeIndex
+            df.reset_index(drop=True).to_feather(file_name, compression=compression)
+        logging.info(f"Колоночный формат, сжатие: {compression}")
+    
+    def render_plots(self, dpi=100, progress_callback=None):
+        """Графики датасета в PNG: [(заголовок, изображение)].
+        
+        Тепловая карта корреляций, гистограмма и бокс-плот каждой числовой
+        колонки рисуются вне экрана в пуле процессов.
+        """
+        specs = self.get_plot_specs()
+        images = self.plot_renderer.render(specs, dpi, progress_callback)
+        return [(spec.title, image) for spec, image in zip(specs, images)]
+        
+    def get_plot_specs(self):
+        """Описания графиков датасета (PlotSpec) с нужными им массивами"""
+        pearson_corr, _ = self.get_correlations()
+        if pearson_corr is None:
+            return []
+        return plot_specs(self.get_numeric_data(), pearson_corr, self.density_engine, self.box_stats)
+        
+    def export_to_html(self, file_name, progress_callback=None):
+        """Экспорт данных в HTML формат (progress_callback получает долю отрисованных графиков)"""
+        if not self.has_data():
             raise ValueError("Нет данных для экспорта")
             
         try:
-            # Создаем временную директорию для графиков
-            temp_dir = tempfile.mkdtemp()
-            plots_dir = os.path.join(temp_dir, 'plots')
-            os.makedirs(plots_dir, exist_ok=True)
-            
             # Создаем графики
             plots_html = []
-            numeric_df = self.df.select_dtypes(include=['number'])
+            pearson_corr, spearman_corr = self.get_correlations()
+            info_html = self.get_data_info().replace('\n', '<br>')
             
-            # Тепловая карта корреляций
-            pearson_corr, _ = self.get_correlations()
-            if pearson_corr is not None:
-                plt.figure(figsize=(10, 8))
-                sns.heatmap(pearson_corr, annot=True, cmap='coolwarm', fmt='.2f')
-                plt.title('Тепловая карта корреляций')
-                plt.tight_layout()
-                
-                # Сохраняем график
-                plot_path = os.path.join(plots_dir, 'correlation_heatmap.png')
-                plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-                plt.close()
-                
-                # Добавляем в HTML
-                with open(plot_path, 'rb') as f:
-                    plot_data = base64.b64encode(f.read()).decode('utf-8')
+            # Тепловая карта корреляций, гистограммы и бокс-плоты (в пуле процессов)
+            for title, image in self.render_plots(dpi=300, progress_callback=progress_callback):
+                plot_data = base64.b64encode(image).decode('utf-8')
                 plots_html.append(f"""
                     <div class="plot-container">
-                        <h3>Тепловая карта корреляций</h3>
-                        <img src="data:image/png;base64,{plot_data}" alt="Тепловая карта корреляций">
-                    </div>
-                """)
-            
-            # Гистограммы и бокс-плоты для числовых колонок
-            for col in numeric_df.columns:
-                # Гистограмма
-                plt.figure(figsize=(10, 5))
-                sns.histplot(data=numeric_df, x=col, kde=True)
-                plt.title(f'Распределение {col}')
-                plt.tight_layout()
-                
-                plot_path = os.path.join(plots_dir, f'hist_{col}.png')
-                plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-                plt.close()
-                
-                with open(plot_path, 'rb') as f:
-                    plot_data = base64.b64encode(f.read()).decode('utf-8')
-                plots_html.append(f"""
-                    <div class="plot-container">
-                        <h3>Распределение {col}</h3>
-                        <img src="data:image/png;base64,{plot_data}" alt="Гистограмма {col}">
-                    </div>
-                """)
-                
-                # Бокс-плот
-                plt.figure(figsize=(10, 5))
-                sns.boxplot(data=numeric_df, y=col)
-                plt.title(f'Бокс-плот {col}')
-                plt.tight_layout()
-                
-                plot_path = os.path.join(plots_dir, f'box_{col}.png')
-                plt.savefig(plot_path, bbox_inches='tight', dpi=300)
-                plt.close()
-                
-                with open(plot_path, 'rb') as f:
-                    plot_data = base64.b64encode(f.read()).decode('utf-8')
-                plots_html.append(f"""
-                    <div class="plot-container">
-                        <h3>Бокс-плот {col}</h3>
-                        <img src="data:image/png;base64,{plot_data}" alt="Бокс-плот {col}">
+                        <h3>{title}</h3>
+                        <img src="data:image/png;base64,{plot_data}" alt="{title}">
                     </div>
                 """)
             
@@ -457,12 +858,12 @@ class DataModel:
                 
                 <h2>Информация о датасете</h2>
                 <div class="info">
-                    {self.get_data_info().replace('\n', '<br>')}
+                    {info_html}
                 </div>
                 
                 <h2>Размерность массива</h2>
                 <div class="info">
-                    {self.df.shape}
+                    {self.get_shape()}
                 </div>
                 
                 <h2>Статистическое описание</h2>
@@ -471,10 +872,10 @@ class DataModel:
                 </div>
                 
                 <h2>Корреляции (Пирсон)</h2>
-                {self.get_correlations()[0].to_html()}
+                {pearson_corr.to_html() if pearson_corr is not None else ''}
                 
                 <h2>Корреляции (Спирмен)</h2>
-                {self.get_correlations()[1].to_html()}
+                {spearman_corr.to_html() if spearman_corr is not None else ''}
                 
                 <h2>Уникальные значения</h2>
                 {self._format_unique_values_html()}
@@ -491,10 +892,6 @@ class DataModel:
             with open(file_name, 'w', encoding='utf-8') as f:
                 f.write(html_content)
                 
-            # Удаляем временную директорию
-            import shutil
-            shutil.rmtree(temp_dir)
-                
             logging.info(f"Данные экспортированы в HTML файл: {file_name}")
             return True
             
@@ -504,10 +901,11 @@ class DataModel:
             
     def export_to_text(self, file_name):
         """Экспорт данных в текстовый формат"""
-        if self.df is None:
+        if not self.has_data():
             raise ValueError("Нет данных для экспорта")
             
         try:
+            pearson_corr, spearman_corr = self.get_correlations()
             # Создаем текстовый отчет
             text_content = f"""
 Отчет по анализу данных
@@ -519,7 +917,7 @@ class DataModel:
 
 Размерность датасета
 ----------------------
-{self.df.shape}
+{self.get_shape()}
 
 Статистическое описание:
 -----------------------
@@ -527,11 +925,11 @@ class DataModel:
 
 Корреляции (Пирсон):
 -------------------
-{self.get_correlations()[0]}
+{pearson_corr}
 
 Корреляции (Спирмен):
 --------------------
-{self.get_correlations()[1]}
+{spearman_corr}
 
 Уникальные значения:
 ------------------
@@ -559,25 +957,29 @@ class DataModel:
             return "<p>Нет данных</p>"
             
         html = "<div class='unique-values'>"
-        for col, values in unique_values.items():
+        for col, summary in unique_values.items():
             html += f"<h3>{col}</h3>"
-            html += "<ul>"
-            for val in values:
-                html += f"<li>{val}</li>"
-            html += "</ul>"
+            html += "".join(f"<p>{note}</p>" for note in summary_notes(summary))
+            if len(summary.top):
+                html += "<ul>"
+                for val in summary.top:
+                    html += f"<li>{val}</li>"
+                html += "</ul>"
         html += "</div>"
         return html
         
     def _format_value_counts_html(self):
+        """Форматирование частот значений для HTML"""
+        value_counts = self.get_value_counts()
+        if value_counts is None:
+            return "<p>Нет данных</p>"
+        
         html = "<div class='value-counts'>"
-        for col, counts in self.get_value_counts().items():
+        for col, summary in value_counts.items():
             html += f"<h3>{col}</h3>"
-            if isinstance(counts, pd.Series):
-                # если Series — выводим табличку
-                html += counts.to_frame().to_html()
-            else:
-                # если это уже строка — оборачиваем в <pre> для сохранения форматирования
-                html += f"<pre>{counts}</pre>"
+            html += "".join(f"<p>{note}</p>" for note in summary_notes(summary, counts=True))
+            if len(summary.top):
+                html += summary.top.to_frame().to_html()
         html += "</div>"
         return html
         
@@ -588,10 +990,8 @@ class DataModel:
             return "Нет данных"
             
         text = ""
-        for col, values in unique_values.items():
-            text += f"\n{col}:\n"
-            for val in values:
-                text += f"  {val}\n"
+        for col, summary in unique_values.items():
+            text += f"\n{col}:\n{format_summary(summary)}\n"
         return text
         
     def _format_value_counts_text(self):
@@ -601,10 +1001,6 @@ class DataModel:
             return "Нет данных"
             
         text = ""
-        for col, counts in value_counts.items():
-            text += f"\n{col}:\n"
-            if isinstance(counts, pd.Series):
-                text += counts.to_string() + "\n"
-            else:
-                text += str(counts) + "\n"
+        for col, summary in value_counts.items():
+            text += f"\n{col}:\n{format_summary(summary, counts=True)}\n"
         return text
\ No newline at end of file
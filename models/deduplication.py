@@ -0,0 +1,156 @@
+import logging
+import os
+import tempfile
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Итог удаления дубликатов: сколько строк удалено и число копий по группам
+# (индекс — метка первой строки группы, значение — сколько её повторов удалено)
+DuplicateReport = namedtuple('DuplicateReport', ['removed', 'groups'])
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+
+class RowDeduplicator:
+    """Удаление дубликатов строк по 64-битному отпечатку.
+
+    Отпечаток строки собирается по колонкам из кодов pd.factorize,
+    поэтому строки целиком в Python-объекты не превращаются, а в памяти
+    держится один массив uint64 на датасет. Совпадения отпечатков
+    (при verify=True) сверяются по значениям, и коллизии не приводят
+    к потере строк.
+
+    Если строк больше spill_rows, отпечатки раскладываются по разделам
+    во временные файлы и дубликаты ищутся раздел за разделом — размер
+    хэш-таблицы поиска повторов ограничен одним разделом.
+    """
+
+    def __init__(self, verify=True, spill_rows=None, spill_dir=None, partitions=64,
+                 chunk_rows=1_000_000):
+        self.verify = verify
+        self.spill_rows = spill_rows
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+        self.chunk_rows = chunk_rows
+
+    def fingerprints(self, df):
+        """64-битный отпечаток каждой строки.
+
+        Значения колонки сначала заменяются кодами pd.factorize (равные
+        значения, включая NaN, получают равные коды), затем коды
+        перемешиваются и объединяются по колонкам.
+        """
+        result = np.zeros(len(df), dtype=np.uint64)
+        with np.errstate(over='ignore'):
+            for i in range(df.shape[1]):
+                codes, _ = pd.factorize(df.iloc[:, i])
+                hashed = _mix(codes.astype(np.uint64) + np.uint64(i + 1) * _GOLDEN)
+                # hash_combine: порядок колонок влияет на результат
+                result ^= hashed + _GOLDEN + (result << np.uint64(6)) + (result >> np.uint64(2))
+        return result
+
+    def duplicated(self, df):
+        """Маска повторов (первое вхождение строки остаётся) и позиции их первых вхождений"""
+        mask = np.zeros(len(df), dtype=bool)
+        first = np.full(len(df), -1, dtype=np.int64)
+        if self.spill_rows is not None and len(df) > self.spill_rows:
+            parts = self._spilled_partitions(df)
+        else:
+            parts = [(self.fingerprints(df), np.arange(len(df), dtype=np.int64))]
+        for hashes, positions in parts:
+            dup_positions, ref_positions = self._find_duplicates(hashes, positions)
+            mask[dup_positions] = True
+            first[dup_positions] = ref_positions
+
+        if self.verify and mask.any():
+            self._verify(df, mask, first)
+        return mask, first
+
+    def drop_duplicates(self, df):
+        """Датасет без повторов и отчёт DuplicateReport"""
+        mask, first = self.duplicated(df)
+        removed = int(mask.sum())
+        groups = pd.Series(dtype='int64')
+        if removed:
+            ref_positions, counts = np.unique(first[mask], return_counts=True)
+            groups = pd.Series(counts, index=df.index[ref_positions]).sort_values(ascending=False)
+            df = df[~mask]
+        logging.info(f"Удалено {removed} дублирующихся строк в {len(groups)} группах")
+        return df, DuplicateReport(removed, groups)
+
+    @staticmethod
+    def _find_duplicates(hashes, positions):
+        """Повторы отпечатков внутри раздела (позиции идут по возрастанию)"""
+        codes, _ = pd.factorize(hashes)
+        first_index = _first_occurrence(codes)
+        is_dup = first_index != np.arange(len(codes))
+        return positions[is_dup], positions[first_index[is_dup]]
+
+    def _spilled_partitions(self, df):
+        """Отпечатки, разложенные по разделам во временных файлах"""
+        hashes = self.fingerprints(df)
+        with tempfile.TemporaryDirectory(dir=self.spill_dir, prefix='dedup_') as tmp:
+            paths = [os.path.join(tmp, f'part_{k}.bin') for k in range(self.partitions)]
+            files = [open(path, 'wb') for path in paths]
+            try:
+                for start in range(0, len(hashes), self.chunk_rows):
+                    block = hashes[start:start + self.chunk_rows]
+                    positions = np.arange(start, start + len(block), dtype=np.int64)
+                    part_ids = block % np.uint64(self.partitions)
+                    for k in np.unique(part_ids):
+                        selected = part_ids == k
+                        np.stack([block[selected].view(np.int64), positions[selected]],
+                                 axis=1).tofile(files[int(k)])
+            finally:
+                for f in files:
+                    f.close()
+            del hashes
+            logging.info(f"Отпечатки строк выгружены на диск: {self.partitions} разделов")
+
+            for path in paths:
+                records = np.fromfile(path, dtype=np.int64).reshape(-1, 2)
+                yield records[:, 0].view(np.uint64), records[:, 1]
+                del records
+
+    @staticmethod
+    def _verify(df, mask, first):
+        """Сверка значений для совпавших отпечатков; коллизии решаются точным сравнением"""
+        candidates = np.flatnonzero(mask)
+        refs = first[candidates]
+        equal = np.ones(len(candidates), dtype=bool)
+        for i in range(df.shape[1]):
+            column = df.iloc[:, i]
+            a = column.iloc[candidates].to_numpy()
+            b = column.iloc[refs].to_numpy()
+            same = np.asarray(pd.isna(a) & pd.isna(b)) | np.asarray(a == b, dtype=bool)
+            equal &= same
+        if equal.all():
+            return
+
+        # Коллизия отпечатков: строки со спорными отпечатками проверяются точно
+        logging.warning(f"Коллизий отпечатков строк: {int((~equal).sum())}, выполняется точная проверка")
+        suspicious = np.union1d(candidates[~equal], refs[~equal])
+        group = np.union1d(suspicious, np.flatnonzero(np.isin(first, suspicious)))
+        rows = df.iloc[group].reset_index(drop=True)
+        codes, _ = pd.factorize(pd.MultiIndex.from_frame(rows, names=range(rows.shape[1])))
+        first_index = _first_occurrence(codes)
+        is_dup = first_index != np.arange(len(codes))
+        mask[group] = is_dup
+        first[group] = np.where(is_dup, group[first_index], -1)
+
+
+def _mix(x):
+    """Перемешивание битов 64-битных значений (финализатор splitmix64)"""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _first_occurrence(codes):
+    """Позиция первого вхождения кода для каждого элемента"""
+    first = np.empty(codes.max() + 1 if len(codes) else 0, dtype=np.int64)
+    # При присваивании в обратном порядке остаётся первое вхождение
+    first[codes[::-1]] = np.arange(len(codes) - 1, -1, -1)
+    return first[codes]
@@ -0,0 +1,112 @@
+from collections import namedtuple
+
+import numpy as np
+
+from models.streaming_stats import ReservoirSample
+
+# Гистограмма колонки: границы и частоты интервалов, сетка и кривая
+# плотности (KDE) в масштабе частот; grid и density — None, если
+# плотность не определена (меньше двух различных значений)
+Histogram = namedtuple('Histogram', ['edges', 'counts', 'grid', 'density'])
+
+
+class DensityEngine:
+    """Гистограммы и кривые плотности числовых колонок.
+
+    Частоты считаются по всем значениям одним проходом (np.bincount по
+    номерам интервалов). Число интервалов выбирается как в
+    np.histogram(bins='auto'), плотность — гауссово KDE с шириной окна
+    по правилу Скотта, как в sns.histplot(kde=True). KDE считается
+    свёрткой через FFT значений, линейно разнесённых по равномерной
+    сетке, а не суммой ядер по всем строкам. Квартили для выбора
+    интервалов и KDE больших колонок считаются по равномерной выборке
+    (reservoir sampling) из sample_size значений. Результаты
+    запоминаются по колонкам до сброса (данные изменились).
+    """
+
+    def __init__(self, sample_size=1_000_000, grid_size=512, max_bins=1000):
+        self.sample_size = sample_size
+        self.grid_size = grid_size
+        self.max_bins = max_bins
+        self._histograms = {}
+
+    def reset(self):
+        """Сброс запомненных гистограмм (данные изменились)"""
+        self._histograms = {}
+
+    def histogram(self, column):
+        """Гистограмма и плотность колонки (Series), запоминается по имени колонки"""
+        if column.name not in self._histograms:
+            values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[np.isfinite(values)]
+            self._histograms[column.name] = compute_histogram(
+                values, self.sample_size, self.grid_size, self.max_bins)
+        return self._histograms[column.name]
+
+
+def compute_histogram(values, sample_size=1_000_000, grid_size=512, max_bins=1000):
+    """Гистограмма и кривая плотности массива конечных значений (Histogram)"""
+    n = len(values)
+    if n == 0:
+        return Histogram(np.array([0.0, 1.0]), np.zeros(1, dtype=np.int64), None, None)
+    low, high = values.min(), values.max()
+    if low == high:
+        # Одно значение: один интервал шириной 1, как в np.histogram
+        return Histogram(np.array([low - 0.5, high + 0.5]), np.array([n], dtype=np.int64), None, None)
+
+    sample = _sample(values, sample_size)
+    bins = _bin_count(sample, n, high - low, max_bins)
+    edges = np.linspace(low, high, bins + 1)
+    index = ((values - low) * (bins / (high - low))).astype(np.intp)
+    counts = np.bincount(np.minimum(index, bins - 1), minlength=bins)
+
+    std = sample.std(ddof=1) if len(sample) > 1 else 0.0
+    if std == 0:
+        return Histogram(edges, counts, None, None)
+    bandwidth = std * len(sample) ** (-1 / 5)
+    grid = np.linspace(low, high, grid_size)
+    density = _binned_kde(sample, grid, bandwidth)
+    # Кривая в масштабе частот: площадь под ней равна площади столбцов
+    return Histogram(edges, counts, grid, density * n * (edges[1] - edges[0]))
+
+
+def _sample(values, size):
+    """Равномерная выборка не более size значений (reservoir sampling по блокам)"""
+    if len(values) <= size:
+        return values
+    reservoir = ReservoirSample(1, size)
+    for start in range(0, len(values), size):
+        reservoir.update(values[start:start + size, None])
+    return reservoir.values[:, 0]
+
+
+def _bin_count(sample, n, span, max_bins):
+    """Число интервалов по правилу 'auto' NumPy: меньшая ширина из Фридмана-Диакониса и Стёрджеса.
+
+    Ширина Фридмана-Диакониса ограничена снизу половиной ширины по
+    правилу квадратного корня (не больше 2·√n интервалов).
+    """
+    width = span / (np.log2(n) + 1.0)
+    q1, q3 = np.percentile(sample, [25, 75])
+    if q3 > q1:
+        width = min(width, max(2.0 * (q3 - q1) * n ** (-1 / 3), span / np.sqrt(n) / 2))
+    return int(min(max(np.ceil(span / width), 1), max_bins))
+
+
+def _binned_kde(sample, grid, bandwidth):
+    """Гауссово KDE на равномерной сетке: линейное разнесение значений по узлам и свёртка через FFT"""
+    size = len(grid)
+    delta = grid[1] - grid[0]
+    position = (sample - grid[0]) / delta
+    left = np.minimum(position.astype(np.intp), size - 2)
+    fraction = position - left
+    weights = (np.bincount(left, 1.0 - fraction, minlength=size)
+               + np.bincount(left + 1, fraction, minlength=size))
+
+    # Ядро усечено на 5 ширинах окна; дополнение нулями исключает циклический перенос
+    half = min(size - 1, int(np.ceil(5 * bandwidth / delta)))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) * delta / bandwidth) ** 2)
+    length = 1 << int(np.ceil(np.log2(size + 2 * half)))
+    smoothed = np.fft.irfft(np.fft.rfft(weights, length) * np.fft.rfft(kernel, length), length)
+    density = smoothed[half:half + size] / (len(sample) * bandwidth * np.sqrt(2 * np.pi))
+    return np.maximum(density, 0.0)
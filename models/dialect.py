@@ -0,0 +1,148 @@
+import csv
+import io
+import logging
+import os
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+# Параметры разбора текстовой таблицы
+Dialect = namedtuple('Dialect', ['delimiter', 'quotechar', 'encoding', 'skipinitialspace'])
+
+
+class DialectSniffer:
+    """Определение разделителя, кавычек и кодировки по выборке из файла.
+
+    Из файла берутся несколько килобайт из начала, середины и конца
+    (обрезанные до целых строк). Каждая пара «разделитель + кавычка»
+    оценивается по согласованности числа колонок: доля записей, у которых
+    оно совпадает с самым частым значением (не меньше двух колонок).
+    Кодировка — первая из кандидатов, которой выборка декодируется без
+    ошибок. Результат кэшируется для файла (путь, размер, mtime).
+    """
+
+    DELIMITERS = ('\t', ',', ';', '|', '~', '#', ' ')
+    QUOTECHARS = ('"', "'")
+    ENCODINGS = ('utf-8', 'cp1251', 'latin-1')
+
+    def __init__(self, sample_size=32 * 1024, max_cached=64):
+        self.sample_size = sample_size
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+
+    def sniff(self, file_name, buffer=None, default_delimiter=None):
+        """Диалект файла (buffer — уже отображённое содержимое, если есть).
+
+        default_delimiter — разделитель по расширению файла: он выигрывает
+        при равных оценках и возвращается, если ни один кандидат не делит
+        строки на колонки. Если разделитель не найден, delimiter равен None.
+        """
+        stat = os.stat(file_name)
+        key = (os.path.abspath(file_name), stat.st_size, stat.st_mtime_ns, default_delimiter)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        if buffer is None:
+            with open(file_name, 'rb') as f:
+                samples = self._read_samples(f, stat.st_size)
+        else:
+            samples = self._slice_samples(buffer)
+        dialect = self.detect(samples, default_delimiter)
+        logging.info(f"Диалект файла: разделитель {dialect.delimiter!r}, кавычка {dialect.quotechar!r}, "
+                     f"кодировка {dialect.encoding}")
+
+        self._cache[key] = dialect
+        if len(self._cache) > self.max_cached:
+            self._cache.popitem(last=False)
+        return dialect
+
+    def detect(self, samples, default_delimiter=None):
+        """Выбор диалекта по списку байтовых выборок"""
+        encoding = self._detect_encoding(samples)
+        texts = [sample.decode(encoding, errors='replace') for sample in samples]
+        joined = '\n'.join(texts)
+
+        candidates = [default_delimiter] if default_delimiter else []
+        candidates += [d for d in self.DELIMITERS if d != default_delimiter and d in joined]
+        quotechars = [q for q in self.QUOTECHARS if q in joined] or ['"']
+
+        best = None
+        for priority, delimiter in enumerate(candidates):
+            skipinitialspace = self._skips_initial_space(joined, delimiter)
+            for quote_rank, quotechar in enumerate(quotechars):
+                consistency = self._consistency(texts, delimiter, quotechar, skipinitialspace)
+                if consistency == 0:
+                    continue
+                score = (round(consistency, 3), -priority, -quote_rank)
+                if best is None or score > best[0]:
+                    best = (score, Dialect(delimiter, quotechar, encoding, skipinitialspace))
+
+        if best is None:
+            return Dialect(default_delimiter, '"', encoding, False)
+        return best[1]
+
+    def _read_samples(self, f, size):
+        """Начало, середина и конец файла"""
+        samples = []
+        for offset in self._sample_offsets(size):
+            f.seek(offset)
+            samples.append(self._trim(f.read(self.sample_size), offset, size))
+        return samples
+
+    def _slice_samples(self, buffer):
+        size = len(buffer)
+        return [self._trim(buffer[offset:offset + self.sample_size], offset, size)
+                for offset in self._sample_offsets(size)]
+
+    def _sample_offsets(self, size):
+        if size <= 3 * self.sample_size:
+            return [0]
+        return [0, (size - self.sample_size) // 2, size - self.sample_size]
+
+    @staticmethod
+    def _trim(block, offset, size):
+        """Обрезка выборки до целых строк"""
+        if offset > 0:
+            block = block[block.find(b'\n') + 1:]
+        if offset + len(block) < size:
+            block = block[:block.rfind(b'\n') + 1]
+        return block
+
+    def _detect_encoding(self, samples):
+        if samples and samples[0].startswith(b'\xef\xbb\xbf'):
+            return 'utf-8-sig'
+        for encoding in self.ENCODINGS:
+            try:
+                for sample in samples:
+                    sample.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+            return encoding
+        return self.ENCODINGS[-1]
+
+    @staticmethod
+    def _consistency(texts, delimiter, quotechar, skipinitialspace):
+        """Доля записей с самым частым числом колонок (0, если колонка одна)"""
+        counts = []
+        for text in texts:
+            try:
+                reader = csv.reader(io.StringIO(text, newline=''), delimiter=delimiter,
+                                    quotechar=quotechar, skipinitialspace=skipinitialspace)
+                counts.extend(len(row) for row in reader if row)
+            except csv.Error:
+                return 0
+        if not counts:
+            return 0
+        values, frequencies = np.unique(counts, return_counts=True)
+        if values[frequencies.argmax()] < 2:
+            return 0
+        return frequencies.max() / len(counts)
+
+    @staticmethod
+    def _skips_initial_space(text, delimiter):
+        """Пробел после большинства разделителей — признак skipinitialspace"""
+        if delimiter == ' ':
+            return False
+        total = text.count(delimiter)
+        return total > 0 and text.count(delimiter + ' ') / total > 0.5
@@ -0,0 +1,73 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=16)
+def zero_value_lookup(zero_values):
+    """Кэшированное множество нулевых значений и их числовые представления"""
+    tokens = frozenset(str(v) for v in zero_values)
+    numeric = pd.to_numeric(pd.Series(sorted(tokens), dtype=object), errors='coerce')
+    return tokens, numeric.dropna().unique().astype(float)
+
+
+class FillRatioEngine:
+    """Векторизованный подсчёт заполненности данных по колонкам.
+
+    Ячейка считается заполненной, если она не NaN и её строковое
+    представление (после strip) не входит в список нулевых значений.
+    """
+
+    def __init__(self, zero_values):
+        self.zero_tokens, self.zero_numbers = zero_value_lookup(tuple(zero_values))
+
+    def count_filled(self, df):
+        """Количество заполненных ячеек в каждой колонке"""
+        counts = [self._count_column(df.iloc[:, i]) for i in range(df.shape[1])]
+        return pd.Series(counts, index=df.columns, dtype='int64')
+
+    def compute(self, df):
+        """Общая заполненность и заполненность по колонкам (в процентах)"""
+        filled = self.count_filled(df)
+        rows = len(df)
+        if rows == 0 or df.shape[1] == 0:
+            return 0.0, filled.astype(float)
+        column_ratios = filled / rows * 100
+        total_ratio = filled.sum() / df.size * 100
+        return float(total_ratio), column_ratios
+
+    def _count_column(self, col):
+        """Подсчёт заполненных ячеек одной колонки"""
+        dtype = col.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            codes = col.cat.codes.to_numpy()
+            uniques = col.cat.categories
+        elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+            return self._count_numeric(col)
+        else:
+            # Хэш-факторизация: проверяем на нулевые значения только уникальные
+            codes, uniques = pd.factorize(col)
+
+        if len(uniques) == 0:
+            return 0
+        is_zero = (
+            pd.Series(np.asarray(uniques, dtype=object))
+            .map(str).str.strip()
+            .isin(self.zero_tokens)
+            .to_numpy()
+        )
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return int(counts[~is_zero].sum())
+
+    def _count_numeric(self, col):
+        """Подсчёт для числовых колонок: строки проверяем только у кандидатов"""
+        filled = int(col.notna().sum())
+        if filled == 0 or self.zero_numbers.size == 0:
+            return filled
+        candidates = col[col.isin(self.zero_numbers)]
+        if candidates.empty:
+            return filled
+        zero_hits = candidates.map(lambda x: str(x).strip() in self.zero_tokens).sum()
+        return filled - int(zero_hits)
+
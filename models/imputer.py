@@ -0,0 +1,73 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+
+class Imputer:
+    """Заполнение пропусков медианой (числовые колонки) и модой (остальные).
+
+    Статистики считаются пакетно: число пропусков — одним isna().sum()
+    по всему датасету, медианы — одним вызовом quantile по блоку
+    числовых колонок, моды — подсчётом по кодам pd.factorize (без
+    сортировки значений). Пропуски заполняются одним вызовом fillna.
+
+    Найденные значения (fill_values) можно применить к другим файлам
+    через transform без повторного расчёта.
+    """
+
+    def __init__(self):
+        self.fill_values = {}
+        self.null_counts = None
+
+    def fit(self, df):
+        """Расчёт значений для заполнения по колонкам с пропусками"""
+        self.null_counts = df.isna().sum()
+        self.fill_values = {}
+        with_nulls = [i for i, count in enumerate(self.null_counts.to_numpy()) if count > 0]
+
+        numeric = [i for i in with_nulls if _is_numeric(df.iloc[:, i])]
+        if numeric:
+            medians = df.iloc[:, numeric].quantile(0.5)
+            for i, median_val in zip(numeric, medians.to_numpy()):
+                if pd.notna(median_val):
+                    self.fill_values[df.columns[i]] = median_val
+                    logging.info(f"Заполнены пропуски в числовом признаке {df.columns[i]} медианой: {median_val}")
+
+        for i in with_nulls:
+            if i in numeric:
+                continue
+            mode_val = _mode(df.iloc[:, i])
+            if mode_val is not None:
+                self.fill_values[df.columns[i]] = mode_val
+                logging.info(f"Заполнены пропуски в категориальном признаке {df.columns[i]} модой: {mode_val}")
+        return self
+
+    def transform(self, df):
+        """Новый датасет с заполненными пропусками"""
+        fill_values = {col: value for col, value in self.fill_values.items() if col in df.columns}
+        if not fill_values:
+            return df
+        return df.fillna(value=fill_values)
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+
+def _is_numeric(column):
+    return pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype)
+
+
+def _mode(column):
+    """Самое частое значение (при равенстве — наименьшее, как в Series.mode)"""
+    codes, uniques = pd.factorize(column)
+    codes = codes[codes >= 0]
+    if not len(codes):
+        return None
+    counts = np.bincount(codes, minlength=len(uniques))
+    candidates = uniques[counts == counts.max()]
+    try:
+        return candidates.sort_values()[0] if len(candidates) > 1 else candidates[0]
+    except TypeError:
+        # Несравнимые значения разных типов: первое по порядку появления
+        return candidates[0]
@@ -0,0 +1,84 @@
+import logging
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# Итог оптимизации: объём в байтах до/после и изменённые типы {колонка: (было, стало)}
+MemoryReport = namedtuple('MemoryReport', ['before', 'after', 'changed'])
+
+
+class MemoryOptimizer:
+    """Сжатие типов загруженного DataFrame без потери значений.
+
+    - строковые колонки с малым числом различных значений → category;
+    - остальные строковые колонки → строки Arrow (если установлен pyarrow);
+    - целые числа → наименьший знаковый тип, вмещающий диапазон;
+    - float64 → float32, только если все значения представимы точно.
+
+    Колонки со смешанными или нехешируемыми значениями не изменяются.
+    """
+
+    def __init__(self, max_category_ratio=0.5, use_arrow_strings=HAS_PYARROW):
+        # Доля различных значений, до которой строковая колонка становится category
+        self.max_category_ratio = max_category_ratio
+        self.use_arrow_strings = use_arrow_strings
+
+    def optimize(self, df):
+        """Замена типов колонок на месте; возвращает MemoryReport"""
+        before = int(df.memory_usage(deep=True).sum())
+        changed = {}
+        for i in range(df.shape[1]):
+            column = df.iloc[:, i]
+            converted = self._optimize_column(column)
+            if converted is not None and converted.dtype != column.dtype:
+                changed[df.columns[i]] = (str(column.dtype), str(converted.dtype))
+                df.isetitem(i, converted)
+        after = int(df.memory_usage(deep=True).sum())
+        logging.info(f"Оптимизация памяти: {format_bytes(before)} → {format_bytes(after)}, "
+                     f"изменено колонок: {len(changed)}")
+        return MemoryReport(before, after, changed)
+
+    def _optimize_column(self, column):
+        dtype = column.dtype
+        if pd.api.types.is_bool_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+            return None
+        if pd.api.types.is_integer_dtype(dtype):
+            return pd.to_numeric(column, downcast='integer')
+        if pd.api.types.is_float_dtype(dtype):
+            if dtype.itemsize <= 4:
+                return None
+            values = column.to_numpy()
+            with np.errstate(over='ignore'):
+                compact = values.astype(np.float32)
+            if np.array_equal(compact.astype(values.dtype), values, equal_nan=True):
+                return pd.Series(compact, index=column.index, name=column.name)
+            return None
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            return self._optimize_strings(column)
+        return None
+
+    def _optimize_strings(self, column):
+        if pd.api.types.infer_dtype(column, skipna=True) != 'string':
+            return None
+        n_unique = column.nunique(dropna=True)
+        if n_unique <= self.max_category_ratio * len(column):
+            return column.astype('category')
+        if self.use_arrow_strings and pd.api.types.is_object_dtype(column.dtype):
+            return column.astype('string[pyarrow]')
+        return None
+
+
+def format_bytes(size):
+    """Размер в удобных единицах"""
+    for unit in ('Б', 'КБ', 'МБ'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.2f} ГБ"
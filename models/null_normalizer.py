@@ -0,0 +1,53 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from models.fill_ratio import zero_value_lookup
+
+
+class NullNormalizer:
+    """Замена нулевых значений (пустые строки, 'NA', '-' и т.п.) на NaN.
+
+    Обрабатываются только строковые, object и category колонки: в числовых
+    строковые токены встретиться не могут. Совпадение ищется по хэш-таблице
+    (isin) за один проход по колонке; для category удаляются сами категории,
+    без обхода значений. Колонки заменяются в переданном DataFrame.
+    """
+
+    def __init__(self, zero_values):
+        self.zero_tokens, _ = zero_value_lookup(tuple(zero_values))
+        self._token_list = sorted(self.zero_tokens)
+
+    def normalize(self, df):
+        """Замена на месте; возвращает число замен по колонкам (только ненулевые)"""
+        counts = {}
+        for i in range(df.shape[1]):
+            column = df.iloc[:, i]
+            dtype = column.dtype
+            if isinstance(dtype, pd.CategoricalDtype):
+                zero_categories = dtype.categories.intersection(self._token_list)
+                if len(zero_categories) == 0:
+                    continue
+                replaced = int(column.isin(zero_categories).sum())
+                df.isetitem(i, column.cat.remove_categories(zero_categories))
+            elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+                mask = column.isin(self._token_list).to_numpy()
+                replaced = int(mask.sum())
+                if not replaced:
+                    continue
+                if pd.api.types.is_object_dtype(dtype):
+                    values = column.to_numpy(copy=True)
+                    values[mask] = np.nan
+                    df.isetitem(i, values)
+                else:
+                    df.isetitem(i, column.mask(mask))
+            else:
+                continue
+            if replaced:
+                counts[df.columns[i]] = replaced
+
+        counts = pd.Series(counts, dtype='int64')
+        logging.info(f"Заменено нулевых значений на NaN: {int(counts.sum())} "
+                     f"в {len(counts)} колонках")
+        return counts
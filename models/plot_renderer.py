@@ -0,0 +1,221 @@
+import io
+import logging
+import math
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from models.correlation import cluster_order, top_correlated
+
+# Описание графика: вид ('heatmap', 'hist', 'box'), заголовок, подпись оси,
+# данные и размер. data — только то, что нужно для рисования: готовая
+# гистограмма с кривой плотности (Histogram), статистики бокс-плота
+# (BoxStats) или (матрица корреляций, подписи колонок, подписывать ли значения)
+PlotSpec = namedtuple('PlotSpec', ['kind', 'title', 'label', 'data', 'figsize'])
+
+# Тепловые карты с большим числом ячеек рисуются без подписей значений
+# (одним изображением imshow) в порядке кластеризации колонок
+ANNOTATE_MAX_CELLS = 400
+# Число колонок в тепловой карте наиболее коррелирующих колонок
+HEATMAP_TOP_N = 20
+# Наибольшее число подписей колонок на оси тепловой карты
+MAX_TICK_LABELS = 60
+
+
+def plot_specs(numeric_df, pearson_corr, density_engine, box_stats):
+    """Тепловая карта корреляций, гистограммы и бокс-плоты числовых колонок.
+
+    Гистограммы и кривые плотности берутся из density_engine
+    (DensityEngine), квартили, усы и выбросы — из box_stats
+    (BoxStatsStore) уже посчитанными.
+    """
+    specs = []
+    if pearson_corr is not None:
+        specs.extend(heatmap_specs(pearson_corr))
+    for i in range(numeric_df.shape[1]):
+        column = numeric_df.iloc[:, i]
+        label = str(column.name)
+        specs.append(PlotSpec('hist', f'Распределение {label}', label,
+                              density_engine.histogram(column), (10, 5)))
+        specs.append(PlotSpec('box', f'Бокс-плот {label}', label, box_stats.stats(column), (10, 5)))
+    return specs
+
+
+def heatmap_specs(corr, annotate_max_cells=ANNOTATE_MAX_CELLS, top_n=HEATMAP_TOP_N):
+    """Тепловые карты матрицы корреляций.
+
+    Небольшая матрица рисуется целиком с подписями значений. Большая —
+    целиком без подписей в порядке иерархической кластеризации колонок
+    и отдельно подматрицей top_n наиболее коррелирующих колонок.
+    """
+    if corr.size <= annotate_max_cells:
+        return [PlotSpec('heatmap', 'Тепловая карта корреляций', None, _heatmap_data(corr, True), (10, 8))]
+    order = cluster_order(corr)
+    specs = [PlotSpec('heatmap', f'Тепловая карта корреляций ({len(corr)} колонок, кластеризация)', None,
+                      _heatmap_data(corr.iloc[order, order], False), (12, 10))]
+    top = top_correlated(corr, top_n)
+    sub = corr.iloc[top, top]
+    order = cluster_order(sub)
+    sub = sub.iloc[order, order]
+    specs.append(PlotSpec('heatmap', f'Тепловая карта: {len(top)} наиболее коррелирующих колонок', None,
+                          _heatmap_data(sub, sub.size <= annotate_max_cells), (10, 8)))
+    return specs
+
+
+def _heatmap_data(corr, annotate):
+    return corr.to_numpy(dtype=np.float64), [str(col) for col in corr.columns], annotate
+
+
+def render_plot(spec, dpi=100):
+    """PNG-изображение графика (Figure с холстом Agg, без pyplot).
+
+    Фигура не регистрируется в pyplot и очищается сразу после записи
+    изображения: после отрисовки в памяти остаются только байты PNG.
+    """
+    fig = Figure(figsize=spec.figsize)
+    FigureCanvasAgg(fig)
+    try:
+        draw_plot(fig, spec)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+def draw_plot(fig, spec):
+    """Рисование графика по описанию на фигуре"""
+    ax = fig.add_subplot(111)
+    if spec.kind == 'heatmap':
+        matrix, labels, annotate = spec.data
+        if annotate:
+            sns.heatmap(pd.DataFrame(matrix, index=labels, columns=labels), annot=True, cmap='coolwarm',
+                        ax=ax, fmt='.2f', annot_kws={'size': 8}, cbar_kws={'label': 'Корреляция'})
+            setp(ax.get_xticklabels(), rotation=45, ha='right')
+            setp(ax.get_yticklabels(), rotation=0)
+        else:
+            # Вся матрица одним изображением вместо отдельной ячейки на каждую пару
+            image = ax.imshow(matrix, cmap='coolwarm', vmin=-1, vmax=1, interpolation='nearest', aspect='auto')
+            fig.colorbar(image, ax=ax, label='Корреляция')
+            ticks = np.arange(0, len(labels), math.ceil(len(labels) / MAX_TICK_LABELS))
+            fontsize = 8 if len(ticks) <= 30 else 6
+            ax.set_xticks(ticks, [labels[i] for i in ticks], rotation=45, ha='right', fontsize=fontsize)
+            ax.set_yticks(ticks, [labels[i] for i in ticks], fontsize=fontsize)
+    elif spec.kind == 'hist':
+        hist = spec.data
+        # Столбцы одной ступенчатой фигурой: сотни интервалов рисуются как один объект
+        ax.stairs(hist.counts, hist.edges, fill=True, color='C0', alpha=0.75)
+        if hist.density is not None:
+            ax.plot(hist.grid, hist.density, color='C0')
+        ax.set_xlabel(spec.label, fontsize=10)
+        ax.set_ylabel('Частота', fontsize=10)
+        setp(ax.get_xticklabels(), rotation=45, ha='right')
+    elif spec.kind == 'box':
+        stats = spec.data
+        if stats.count:
+            # Готовые квартили, усы и выбросы: значения колонки не нужны
+            box = {'med': stats.median, 'q1': stats.q1, 'q3': stats.q3, 'whislo': stats.whislo,
+                   'whishi': stats.whishi, 'fliers': stats.fliers, 'label': ''}
+            line = {'color': '#404040'}
+            ax.bxp([box], widths=0.8, patch_artist=True,
+                   boxprops={'facecolor': sns.desaturate('C0', 0.75), 'edgecolor': '#404040'},
+                   whiskerprops=line, capprops=line, medianprops=line,
+                   flierprops={'marker': 'o', 'markerfacecolor': 'none', 'markeredgecolor': '#404040'})
+        ax.set_ylabel(spec.label, fontsize=10)
+        ax.set_xlabel(f'Выбросов: {stats.outliers_low + stats.outliers_high}', fontsize=10)
+    else:
+        raise ValueError(f"Неизвестный вид графика: {spec.kind}")
+    ax.set_title(spec.title, pad=20, fontsize=12)
+    fig.tight_layout()
+
+
+class PlotRenderer:
+    """Отрисовка графиков вне экрана (Agg) в пуле процессов.
+
+    Каждая задача получает описание одного графика (PlotSpec) только с
+    нужными ему массивами и возвращает PNG-изображение; порядок
+    результатов совпадает с порядком описаний. Процессы запускаются
+    методом spawn (fork многопоточного процесса с Qt небезопасен) один
+    раз и переиспользуются. Небольшие наборы графиков рисуются в
+    текущем процессе. Рендерер можно вызывать из нескольких потоков
+    (вкладка графиков и экспорт): пул создаётся и останавливается под
+    блокировкой.
+    """
+
+    def __init__(self, workers=None, min_plots=4):
+        self.workers = workers
+        self.min_plots = min_plots
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self):
+        return self.workers or os.cpu_count() or 1
+
+    def render(self, specs, dpi=100, progress_callback=None):
+        """PNG-изображения графиков (bytes) в порядке описаний"""
+        specs = list(specs)
+        if self.max_workers <= 1 or len(specs) < self.min_plots:
+            return self._render_serial(specs, dpi, progress_callback)
+        pool = self._get_pool()
+        try:
+            return self._render_pool(pool, specs, dpi, progress_callback)
+        except BrokenProcessPool as e:
+            logging.warning(f"Пул отрисовки графиков недоступен, графики рисуются последовательно: {str(e)}")
+            self._discard_pool(pool)
+            return self._render_serial(specs, dpi, progress_callback)
+
+    def shutdown(self):
+        """Остановка процессов отрисовки"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self):
+        """Общий пул процессов (создаётся при первом использовании)"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Остановка сломанного пула (если другой поток его ещё не заменил)"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _render_serial(self, specs, dpi, progress_callback):
+        images = []
+        for spec in specs:
+            images.append(render_plot(spec, dpi))
+            if progress_callback:
+                progress_callback(len(images) / len(specs))
+        return images
+
+    def _render_pool(self, pool, specs, dpi, progress_callback):
+        futures = [pool.submit(render_plot, spec, dpi) for spec in specs]
+        try:
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+                if progress_callback:
+                    progress_callback((len(futures) - len(pending)) / len(futures))
+            return [future.result() for future in futures]
+        except BaseException:
+            # Отмена или ошибка: оставшиеся графики не рисуем
+            for future in futures:
+                future.cancel()
+            raise
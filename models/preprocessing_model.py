@@ -0,0 +1,269 @@
+import datetime
+import gzip
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from models.imputer import Imputer
+from models.null_normalizer import NullNormalizer
+
+# Варианты one-hot кодирования: плотные колонки uint8 или разреженные (SparseDtype)
+ONE_HOT_ENCODINGS = ('One-Hot кодирование', 'Разреженное One-Hot кодирование')
+SPARSE_ONE_HOT = 'Разреженное One-Hot кодирование'
+# Колонка для категорий за пределами top-K
+OTHER_LABEL = 'Прочее'
+
+
+class PreprocessingModel:
+    """Обученные параметры предобработки, применимые к новым файлам.
+
+    Хранит нулевые значения, значения для заполнения пропусков, параметры
+    StandardScaler (среднее и масштаб), словари числового кодирования и
+    категории one-hot кодирования. One-hot колонки имеют тип uint8
+    (в разреженном режиме — Sparse[uint8, 0]), остальные колонки не
+    меняются. Колонки с числом категорий больше max_categories либо не
+    кодируются, либо (other_bucket) получают top-K категорий и колонку
+    «Прочее». Части модели обучаются шагами
+    конвейера предобработки (fit_*), а transform применяет их к новым
+    данным без повторного обучения — в том числе поблочно.
+
+    Модель сохраняется в компактный JSON, сжатый gzip.
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self):
+        self.zero_values = []
+        # Число замен нулевых значений по колонкам при обучении
+        self.null_replacements = None
+        self.imputer = Imputer()
+        # Параметры масштабирования: колонки, средние и стандартные отклонения
+        self.scaler = None
+        self.encoding_type = 'Без кодирования'
+        # Числовое кодирование: колонка -> категории (код = позиция в списке)
+        self.vocabularies = {}
+        # One-hot кодирование: колонка -> категории
+        self.one_hot = {}
+        # Колонки с top-K категориями: колонка -> имя категории «Прочее»
+        self.one_hot_other = {}
+        self.sparse = False
+        # Колонки результата в порядке обучения
+        self.columns = None
+
+    @property
+    def fitted(self):
+        return self.columns is not None
+
+    def fit_nulls(self, df, zero_values):
+        """Замена нулевых значений на NaN (вход не изменяется)"""
+        self.zero_values = list(zero_values)
+        df = df.copy(deep=False)
+        self.null_replacements = NullNormalizer(self.zero_values).normalize(df)
+        return df
+
+    def fit_imputer(self, df):
+        """Заполнение пропусков медианой и модой"""
+        self.imputer = Imputer()
+        return self.imputer.fit_transform(df)
+
+    def fit_scaler(self, df, normalize):
+        """Стандартизация числовых колонок (среднее 0, стд. откл. 1)"""
+        self.scaler = None
+        if not normalize:
+            return df
+        numeric = [col for col in df.columns if _is_numeric(df[col])]
+        if not numeric:
+            return df
+        scaler = StandardScaler().fit(df[numeric].to_numpy(dtype=float))
+        self.scaler = {'columns': numeric, 'mean': scaler.mean_.tolist(), 'scale': scaler.scale_.tolist()}
+        logging.info("Данные нормализованы с помощью StandardScaler")
+        return self._apply_scaler(df)
+
+    def fit_encoder(self, df, encoding_type, max_categories=10, other_bucket=False):
+        """Числовое или one-hot кодирование категориальных колонок"""
+        self.encoding_type = encoding_type
+        self.vocabularies = {}
+        self.one_hot = {}
+        self.one_hot_other = {}
+        self.sparse = encoding_type == SPARSE_ONE_HOT
+        categorical_cols = df.select_dtypes(include=['object', 'category', 'string']).columns
+        if encoding_type == 'Числовое кодирование':
+            for col in categorical_cols:
+                self.vocabularies[col] = pd.Categorical(df[col]).categories.tolist()
+            logging.info("Применено числовое кодирование")
+        elif encoding_type in ONE_HOT_ENCODINGS:
+            for col in categorical_cols:
+                counts = df[col].value_counts()
+                counts = counts[counts > 0]
+                if len(counts) <= max_categories:
+                    self.one_hot[col] = pd.Categorical(df[col]).categories.tolist()
+                elif other_bucket:
+                    self.one_hot[col] = _sorted(counts.index[:max_categories])
+                    other = OTHER_LABEL
+                    while other in self.one_hot[col]:
+                        other += '_'
+                    self.one_hot_other[col] = other
+            if self.one_hot:
+                logging.info(f"Применено one-hot кодирование к колонкам: {list(self.one_hot)}")
+        result = self._apply_encoder(df)
+        self.columns = list(result.columns)
+        return result
+
+    def transform(self, df):
+        """Применение обученной модели к новым данным"""
+        if not self.fitted:
+            raise ValueError("Модель предобработки не обучена")
+        df = self._apply_nulls(df)
+        df = self.imputer.transform(df)
+        df = self._apply_scaler(df)
+        df = self._apply_encoder(df)
+        missing = [col for col in self.columns if col not in df.columns]
+        if missing:
+            raise ValueError(f"В файле нет колонок, на которых обучена модель: {missing}")
+        return df[self.columns]
+
+    def _apply_nulls(self, df):
+        df = df.copy(deep=False)
+        NullNormalizer(self.zero_values).normalize(df)
+        return df
+
+    def _apply_scaler(self, df):
+        if self.scaler is None:
+            return df
+        df = df.copy(deep=False)
+        for col, mean, scale in zip(self.scaler['columns'], self.scaler['mean'], self.scaler['scale']):
+            if col in df.columns:
+                df[col] = (df[col].astype(float) - mean) / scale
+        return df
+
+    def _apply_encoder(self, df):
+        if self.vocabularies:
+            df = df.copy(deep=False)
+            for col, categories in self.vocabularies.items():
+                if col in df.columns:
+                    # Неизвестные категории получают код -1, как пропуски
+                    df[col] = pd.Categorical(df[col], categories=categories).codes
+        if self.one_hot:
+            encoded = [col for col in self.one_hot if col in df.columns]
+            dummies = [pd.get_dummies(self._one_hot_values(df[col]), prefix=col, dtype=np.uint8,
+                                      sparse=self.sparse).set_axis(df.index)
+                       for col in encoded]
+            df = pd.concat([df.drop(columns=encoded)] + dummies, axis=1)
+        return df
+
+    def _one_hot_values(self, column):
+        """Категории колонки для get_dummies (редкие значения — в «Прочее»)"""
+        categories = self.one_hot[column.name]
+        values = pd.Categorical(column, categories=categories)
+        other = self.one_hot_other.get(column.name)
+        if other is None:
+            return values
+        codes = values.codes.copy()
+        codes[(codes < 0) & column.notna().to_numpy()] = len(categories)
+        return pd.Categorical.from_codes(codes, categories=list(categories) + [other])
+
+    def to_dict(self):
+        return {
+            'version': self.FORMAT_VERSION,
+            'zero_values': self.zero_values,
+            'fill_values': list(self.imputer.fill_values.items()),
+            'scaler': self.scaler,
+            'encoding_type': self.encoding_type,
+            'vocabularies': list(self.vocabularies.items()),
+            'one_hot': list(self.one_hot.items()),
+            'one_hot_other': list(self.one_hot_other.items()),
+            'sparse': self.sparse,
+            'columns': self.columns,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != cls.FORMAT_VERSION:
+            raise ValueError(f"Неподдерживаемая версия модели предобработки: {data.get('version')}")
+        model = cls()
+        model.zero_values = data['zero_values']
+        model.imputer.fill_values = {col: value for col, value in data['fill_values']}
+        model.scaler = data['scaler']
+        model.encoding_type = data['encoding_type']
+        model.vocabularies = {col: categories for col, categories in data['vocabularies']}
+        model.one_hot = {col: categories for col, categories in data['one_hot']}
+        model.one_hot_other = {col: other for col, other in data.get('one_hot_other', [])}
+        model.sparse = data.get('sparse', False)
+        model.columns = data['columns']
+        return model
+
+    def save(self, file_name):
+        """Сохранение модели (JSON + gzip)"""
+        with gzip.open(file_name, 'wt', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, separators=(',', ':'), default=_to_json)
+        logging.info(f"Модель предобработки сохранена: {file_name}")
+
+    @classmethod
+    def load(cls, file_name):
+        """Загрузка сохранённой модели"""
+        try:
+            with gzip.open(file_name, 'rt', encoding='utf-8') as f:
+                data = json.load(f, object_hook=_from_json)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Файл не является моделью предобработки: {str(e)}") from e
+        return cls.from_dict(data)
+
+
+def sparse_positions(df):
+    """Позиции разреженных колонок"""
+    return [i for i, dtype in enumerate(df.dtypes) if isinstance(dtype, pd.SparseDtype)]
+
+
+def to_dense(df):
+    """Датасет с плотными колонками вместо разреженных (остальные не копируются).
+
+    Нужен там, где pandas или pyarrow не поддерживают SparseDtype:
+    describe, корреляции, графики, запись Parquet/Feather/Excel.
+    """
+    positions = sparse_positions(df)
+    if not positions:
+        return df
+    df = df.copy(deep=False)
+    for i in positions:
+        df.isetitem(i, df.iloc[:, i].sparse.to_dense())
+    return df
+
+
+def _sorted(values):
+    """Список значений по возрастанию (несравнимые — в исходном порядке)"""
+    try:
+        return values.sort_values().tolist()
+    except TypeError:
+        return values.tolist()
+
+
+def _is_numeric(column):
+    return pd.api.types.is_numeric_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype)
+
+
+def _to_json(value):
+    """Значения NumPy/pandas, которые json не сериализует сам.
+
+    Даты и интервалы записываются ISO-строкой с меткой типа, чтобы при
+    загрузке (_from_json) они восстановились значениями, а не строками.
+    """
+    if isinstance(value, (datetime.datetime, np.datetime64)):
+        return {'__datetime__': pd.Timestamp(value).isoformat()}
+    if isinstance(value, (datetime.timedelta, np.timedelta64)):
+        return {'__timedelta__': pd.Timedelta(value).isoformat()}
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _from_json(obj):
+    """Восстановление значений, записанных _to_json с меткой типа"""
+    if len(obj) == 1:
+        if '__datetime__' in obj:
+            return pd.Timestamp(obj['__datetime__'])
+        if '__timedelta__' in obj:
+            return pd.Timedelta(obj['__timedelta__'])
+    return obj
@@ -0,0 +1,72 @@
+import logging
+
+
+class PreprocessingStep:
+    """Шаг предобработки: функция df -> df и имена параметров, от которых она зависит.
+
+    Функция не должна изменять входной DataFrame: результаты шагов
+    с memoize=True запоминаются и переиспользуются при следующих запусках.
+    """
+
+    def __init__(self, name, func, options=(), memoize=False):
+        self.name = name
+        self.func = func
+        self.options = tuple(options)
+        self.memoize = memoize
+
+
+class PreprocessingPipeline:
+    """Упорядоченные шаги предобработки поверх исходного (неизменяемого) датасета.
+
+    Запоминаются только результаты шагов с memoize (дорогих: каждый
+    результат — ещё одна копия данных) вместе с параметрами их и всех
+    предыдущих шагов. Повторный запуск продолжается с последнего
+    запомненного результата, параметры которого не изменились, поэтому
+    смена, например, нормализации пересчитывает только шаги после
+    последнего запомненного.
+    """
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.raw = None
+        self._memo = {}
+
+    def set_raw(self, df):
+        """Новый исходный датасет (сбрасывает запомненные результаты)"""
+        self.raw = df
+        self._memo.clear()
+
+    def reset(self):
+        self.set_raw(None)
+
+    def run(self, **options):
+        """Прогон конвейера; возвращает результат последнего шага"""
+        if self.raw is None:
+            return None
+        keys = []
+        key = ()
+        for step in self.steps:
+            key += tuple((name, _freeze(options[name])) for name in step.options)
+            keys.append(key)
+
+        # Продолжение с последнего запомненного результата с теми же параметрами
+        start, df = 0, self.raw
+        for i in reversed(range(len(self.steps))):
+            memo = self._memo.get(self.steps[i].name)
+            if memo is not None and memo[0] == keys[i]:
+                start, df = i + 1, memo[1]
+                break
+
+        for step, key in zip(self.steps[start:], keys[start:]):
+            logging.info(f"Шаг предобработки: {step.name}")
+            df = step.func(df, **{name: options[name] for name in step.options})
+            if step.memoize:
+                self._memo[step.name] = (key, df)
+        return df
+
+
+def _freeze(value):
+    """Хэшируемое представление параметра для сравнения"""
+    if isinstance(value, (list, tuple)):
+        return tuple(value)
+    return value
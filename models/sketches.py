@@ -0,0 +1,389 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from models.column_stats import ValueSummary, is_high_cardinality
+
+
+class HyperLogLog:
+    """Оценка числа различных значений (HyperLogLog, 64-битные хэши).
+
+    Относительная стандартная ошибка — 1.04 / sqrt(2^precision).
+    Повторное добавление того же значения оценку не меняет, поэтому
+    блоки можно добавлять хэшами их уникальных значений.
+    """
+
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, error):
+        """Точность, при которой стандартная ошибка не больше error"""
+        precision = math.ceil(math.log2((1.04 / error) ** 2))
+        return cls(min(max(precision, 4), 18))
+
+    @property
+    def error(self):
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update(self, hashes):
+        p = np.uint64(self.precision)
+        index = (hashes >> (np.uint64(64) - p)).astype(np.intp)
+        rest = hashes << p
+        ranks = np.minimum(_leading_zeros(rest) + 1, 64 - self.precision + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, ranks)
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Малые значения: линейный подсчёт по пустым регистрам
+            return m * math.log(m / zeros)
+        return float(raw)
+
+
+class CountMinSketch:
+    """Частоты значений с ограниченной ошибкой (Count-Min).
+
+    Оценка не меньше истинной частоты и превышает её не больше чем на
+    error · N (N — число добавленных значений) с вероятностью 1 - delta.
+    """
+
+    def __init__(self, width, depth):
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+
+    @classmethod
+    def for_error(cls, error, delta=0.01):
+        return cls(math.ceil(math.e / error), math.ceil(math.log(1 / delta)))
+
+    @property
+    def error(self):
+        return math.e / self.width
+
+    def _columns(self, hashes):
+        # Для каждой строки таблицы — свой перемешанный хэш: при двойном
+        # хэшировании (h1 + i·h2) значения, совпавшие по h1 и h2 по модулю
+        # ширины, сталкивались бы во всех строках сразу
+        # (половины 32 бит перемешанного хэша — на две строки)
+        width = np.uint64(self.width)
+        low_bits = np.uint64(0xFFFFFFFF)
+        columns = []
+        for seed in range(1, (self.depth + 1) // 2 + 1):
+            mixed = _mix(hashes, seed)
+            columns.append(((mixed & low_bits) % width).astype(np.intp))
+            columns.append(((mixed >> np.uint64(32)) % width).astype(np.intp))
+        return columns[:self.depth]
+
+    def update(self, hashes, weights=None):
+        """Добавление значений (weights — число повторений каждого значения)"""
+        for row, columns in enumerate(self._columns(hashes)):
+            self.table[row] += np.bincount(columns, weights, minlength=self.width).astype(np.int64, copy=False)
+        self.total += len(hashes) if weights is None else int(np.sum(weights))
+
+    def query(self, hashes):
+        estimates = [self.table[row][columns] for row, columns in enumerate(self._columns(hashes))]
+        return np.min(estimates, axis=0) if estimates else np.zeros(len(hashes), dtype=np.int64)
+
+    def merge(self, other):
+        self.table += other.table
+        self.total += other.total
+
+
+class QuantileSketch:
+    """Квантили потока с ограниченной ошибкой ранга (KLL).
+
+    Значения хранятся в уровнях-компакторах: переполненный уровень
+    сортируется, и каждый второй элемент переходит на уровень выше
+    с удвоенным весом. Вместимость уровней убывает геометрически
+    (множитель 2/3) от верхнего к нижнему; нормированная ошибка ранга
+    оценивается как 1.854 / k^0.9657.
+    """
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, error, seed=0):
+        return cls(max(8, math.ceil((1.854 / error) ** (1 / 0.9657))), seed)
+
+    @property
+    def error(self):
+        return 1.854 / self.k ** 0.9657
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # Нечётный элемент остаётся на уровне
+            keep = items[len(items) - len(items) % 2:]
+            items = items[:len(items) - len(items) % 2]
+            offset = int(self._rng.integers(2))
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], items[offset::2]])
+            # После добавления уровня вместимость нижних уровней меняется
+            level = 0
+
+    def quantiles(self, qs):
+        items = np.concatenate(self.levels)
+        if not len(items):
+            return np.full(len(qs), np.nan)
+        if len(self.levels) == 1:
+            # Сжатий не было: все значения сохранены, квантили точные (как в pandas)
+            return np.quantile(items, qs)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items = items[order]
+        cumulative = np.cumsum(weights[order])
+        targets = np.asarray(qs) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, targets, side='left'), len(items) - 1)
+        return items[positions]
+
+
+class ColumnSketch:
+    """Скетчи одной колонки: число различных значений, частые значения, квантили"""
+
+    def __init__(self, error, numeric, seed=0, quantiles=True):
+        self.error = error
+        self.numeric = numeric
+        self.rows = 0
+        self.distinct = HyperLogLog.for_error(error)
+        self.frequencies = CountMinSketch.for_error(error)
+        self.quantiles = QuantileSketch.for_error(error, seed) if numeric and quantiles else None
+        # Кандидаты в частые значения (значение -> хэш) берутся из случайной
+        # выборки строк каждого блока: значение с долей больше error попадает
+        # в выборку из 20/error строк в среднем 20 раз.
+        self.capacity = math.ceil(1 / error)
+        self.sample_size = math.ceil(20 / error)
+        self.candidates = pd.Series(dtype='uint64')
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_counts(cls, counts, error, seed=0):
+        """Скетч по готовым частотам (Series значение -> частота), без квантилей.
+
+        Точные частоты переносятся в скетч, когда перестают помещаться в
+        память; дальше скетч обновляется блоками значений.
+        """
+        sketch = cls(error, _is_numeric(counts.index), seed, quantiles=False)
+        if not len(counts):
+            return sketch
+        values = pd.Series(counts.index)
+        hashes = _hash_values(values, sketch.numeric)
+        weights = counts.to_numpy(dtype=np.int64)
+        sketch.rows = int(weights.sum())
+        nulls = values.isna().to_numpy()
+        sketch.distinct.update(hashes[~nulls] if nulls.any() else hashes)
+        sketch.frequencies.update(hashes, weights)
+        top = np.argsort(-weights, kind='stable')[:sketch.capacity]
+        sketch._add_candidates(pd.Series(hashes[top], index=pd.Index(values.to_numpy()[top], dtype=object)))
+        return sketch
+
+    def update(self, column):
+        """Добавление блока значений: хэши строк, без подсчёта точных частот"""
+        if not len(column):
+            return
+        self.rows += len(column)
+        if self.numeric and not _is_numeric(column):
+            # В блоке потоковой загрузки встретились нечисловые значения
+            column = pd.to_numeric(column, errors='coerce')
+        hashes = _hash_values(column, self.numeric)
+        nulls = column.isna().to_numpy()
+        self.distinct.update(hashes[~nulls] if nulls.any() else hashes)
+        self.frequencies.update(hashes)
+
+        positions = self._rng.integers(0, len(column), size=min(len(column), self.sample_size))
+        sampled_hashes, first = np.unique(hashes[positions], return_index=True)
+        values = column.iloc[positions[first]]
+        self._add_candidates(pd.Series(sampled_hashes, index=pd.Index(values.to_numpy(), dtype=object)))
+        if self.quantiles is not None:
+            self.quantiles.update(column.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    def merge(self, other):
+        self.rows += other.rows
+        self.distinct.merge(other.distinct)
+        self.frequencies.merge(other.frequencies)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        self._add_candidates(other.candidates)
+
+    def _add_candidates(self, candidates):
+        merged = pd.concat([self.candidates, candidates])
+        merged = merged[~merged.index.duplicated()]
+        if len(merged) > self.capacity:
+            estimates = self.frequencies.query(merged.to_numpy(dtype=np.uint64))
+            merged = merged.iloc[np.argsort(-estimates, kind='stable')[:self.capacity]]
+        self.candidates = merged
+
+    def heavy_hitters(self, n):
+        """Частые значения с оценками частот (по убыванию).
+
+        Значения, оценка которых не превышает погрешность, не выводятся:
+        их частота неотличима от нуля.
+        """
+        estimates = self.frequencies.query(self.candidates.to_numpy(dtype=np.uint64))
+        result = pd.Series(estimates, index=self.candidates.index, dtype='int64')
+        result = result[result > self.frequency_bound]
+        return result.sort_values(ascending=False, kind='stable').head(n)
+
+    @property
+    def frequency_bound(self):
+        """Максимальная ошибка оценки частоты (в строках)"""
+        return math.ceil(self.frequencies.error * self.frequencies.total)
+
+    def value_counts_summary(self, top_n=20):
+        """Сводка частот: оценка числа различных значений и частые значения"""
+        distinct = round(self.distinct.estimate())
+        return ValueSummary(self.rows, distinct, self.heavy_hitters(top_n),
+                            is_high_cardinality(distinct, self.rows, top_n),
+                            distinct_error=self.distinct.error,
+                            count_error=self.frequency_bound)
+
+
+class ApproximateStats:
+    """Приближённые статистики датасета по скетчам.
+
+    Скетчи колонок обновляются блоками и объединяются (merge), поэтому
+    одинаково работают с датасетом в памяти (обходится срезами по
+    chunk_rows строк) и с потоковой загрузкой. error задаёт допустимую
+    погрешность: относительную для числа различных значений, долю
+    строк для частот, долю ранга для квантилей.
+    """
+
+    def __init__(self, error=0.01, chunk_rows=1_000_000):
+        self.error = error
+        self.chunk_rows = chunk_rows
+        self.columns = None
+        self.sketches = {}
+
+    def update(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.columns)
+            for i, col in enumerate(self.columns):
+                numeric = _is_numeric(chunk.iloc[:, i])
+                self.sketches[col] = ColumnSketch(self.error, numeric, seed=i)
+        for start in range(0, len(chunk), self.chunk_rows):
+            part = chunk.iloc[start:start + self.chunk_rows]
+            for i, col in enumerate(self.columns):
+                column = part.iloc[:, i]
+                if isinstance(column.dtype, pd.SparseDtype):
+                    column = column.sparse.to_dense()
+                self.sketches[col].update(column)
+
+    def merge(self, other):
+        if self.columns is None:
+            self.columns = other.columns
+            self.sketches = other.sketches
+            return
+        for col, sketch in other.sketches.items():
+            self.sketches[col].merge(sketch)
+
+    def quartiles(self, col):
+        """25%, 50% и 75% колонки (None для нечисловых)"""
+        sketch = self.sketches[col]
+        if sketch.quantiles is None:
+            return None
+        return sketch.quantiles.quantiles([0.25, 0.5, 0.75])
+
+    def describe(self, exact):
+        """describe() с квартилями по скетчам; погрешность ранга указана в подписях строк.
+
+        exact — таблица точных count, mean, std, min, max по колонкам.
+        """
+        names = ['25%', '50%', '75%']
+        quartiles = pd.DataFrame(np.nan, index=names, columns=exact.columns)
+        errors = []
+        for i, col in enumerate(exact.columns):
+            values = self.quartiles(col)
+            if values is not None:
+                quartiles.iloc[:, i] = values
+                errors.append(self.sketches[col].quantiles.error)
+        bound = f" (±{max(errors):.1%} ранга)" if errors else ""
+        quartiles.index = [name + bound for name in names]
+        return pd.concat([exact.loc[['count', 'mean', 'std', 'min']], quartiles, exact.loc[['max']]])
+
+    def value_counts_summary(self, col, top_n=20):
+        """Сводка частот колонки: оценка числа различных значений и частые значения"""
+        return self.sketches[col].value_counts_summary(top_n)
+
+    def unique_summary(self, col, top_n=20):
+        """Сводка уникальных значений колонки (значениями служат частые значения)"""
+        summary = self.value_counts_summary(col, top_n)
+        return summary._replace(top=pd.Series(summary.top.index, dtype=object))
+
+
+def _is_numeric(column):
+    dtype = column.dtype
+    if isinstance(dtype, pd.SparseDtype):
+        dtype = dtype.subtype
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _hash_values(column, numeric):
+    """64-битные хэши значений (одинаковые значения — одинаковые хэши в любом блоке).
+
+    Числа хэшируются как float64: в разных блоках одна колонка может
+    прочитаться и как int64, и как float64 (если в блоке есть пропуски).
+    """
+    if numeric:
+        return pd.util.hash_array(column.to_numpy(dtype=np.float64, na_value=np.nan))
+    return pd.util.hash_pandas_object(column, index=False, categorize=False).to_numpy(dtype=np.uint64)
+
+
+def _mix(hashes, seed):
+    """Перемешивание 64-битных хэшей с затравкой (финализатор splitmix64)"""
+    with np.errstate(over='ignore'):
+        z = hashes + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+
+def _leading_zeros(values):
+    """Число ведущих нулевых бит 64-битных значений.
+
+    Старшие 53 бита точно представимы в float64, длина числа в битах
+    берётся из двоичного порядка (frexp). Значения, у которых все старшие
+    53 бита нулевые, считаются нулями (64).
+    """
+    _, exponents = np.frexp((values >> np.uint64(11)).astype(np.float64))
+    return np.where(exponents > 0, 53 - exponents, 64)
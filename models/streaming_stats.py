@@ -0,0 +1,337 @@
+import io
+import logging
+import warnings
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from models.sketches import ColumnSketch
+
+
+class RunningMoments:
+    """Объединяемые моменты (count, mean, M2, min, max) для набора числовых колонок"""
+
+    def __init__(self, n_cols):
+        self.count = np.zeros(n_cols)
+        self.mean = np.zeros(n_cols)
+        self.m2 = np.zeros(n_cols)
+        self.min = np.full(n_cols, np.nan)
+        self.max = np.full(n_cols, np.nan)
+
+    def update(self, values):
+        """Добавление блока значений (строки × колонки, NaN — пропуск)"""
+        mask = ~np.isnan(values)
+        count = mask.sum(axis=0).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            total = np.where(mask, values, 0.0).sum(axis=0)
+            mean = np.where(count > 0, total / count, 0.0)
+            centered = np.where(mask, values - mean, 0.0)
+            m2 = (centered ** 2).sum(axis=0)
+        chunk = RunningMoments(values.shape[1])
+        chunk.count, chunk.mean, chunk.m2 = count, mean, m2
+        if values.shape[0]:
+            with _ignore_all_nan_warnings():
+                chunk.min = np.nanmin(values, axis=0)
+                chunk.max = np.nanmax(values, axis=0)
+        self.merge(chunk)
+
+    def merge(self, other):
+        """Объединение с другим набором моментов (формулы Чана)"""
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, other.count / n, 0.0)
+            self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.mean = self.mean + delta * weight
+        self.count = n
+        self.min = np.fmin(self.min, other.min)
+        self.max = np.fmax(self.max, other.max)
+
+    @property
+    def std(self):
+        """Выборочное стандартное отклонение (ddof=1, как в pandas)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class CoMomentMatrix:
+    """Объединяемые попарные ко-моменты для корреляции Пирсона.
+
+    Как и DataFrame.corr(), учитывает для каждой пары только строки,
+    где заполнены обе колонки. Значения сдвигаются на фиксированный
+    вектор (средние первого блока) для численной устойчивости.
+    """
+
+    def __init__(self, n_cols):
+        shape = (n_cols, n_cols)
+        self.shift = None
+        self.n = np.zeros(shape)
+        self.mean_x = np.zeros(shape)
+        self.var_x = np.zeros(shape)
+        self.cov = np.zeros(shape)
+
+    def update(self, values):
+        """Добавление блока значений (строки × колонки, NaN — пропуск)"""
+        if self.shift is None:
+            with _ignore_all_nan_warnings():
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0)) if len(values) else 0.0
+        mask = ~np.isnan(values)
+        weights = mask.astype(float)
+        shifted = np.where(mask, values - self.shift, 0.0)
+
+        n = weights.T @ weights
+        sum_x = shifted.T @ weights
+        sum_xx = (shifted ** 2).T @ weights
+        sum_xy = shifted.T @ shifted
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = np.where(n > 0, sum_x / n, 0.0)
+        mean_y = mean_x.T
+        cov = sum_xy - n * mean_x * mean_y
+        var_x = sum_xx - n * mean_x ** 2
+
+        total = self.n + n
+        dx = mean_x - self.mean_x
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(total > 0, n / total, 0.0)
+        factor = self.n * weight
+        self.cov = self.cov + cov + dx * dx.T * factor
+        self.var_x = self.var_x + var_x + dx ** 2 * factor
+        self.mean_x = self.mean_x + dx * weight
+        self.n = total
+
+    def correlation(self):
+        """Матрица корреляций Пирсона"""
+        var_y = self.var_x.T
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.cov / np.sqrt(self.var_x * var_y)
+        corr[(self.n < 2) | (self.var_x <= 0) | (var_y <= 0)] = np.nan
+        corr = np.clip(corr, -1.0, 1.0)
+        diagonal = np.diag(corr).copy()
+        np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1.0))
+        return corr
+
+
+class ValueCountAccumulator:
+    """Объединяемые частоты значений по колонкам.
+
+    Частоты блоков копятся в списке и периодически сворачиваются,
+    чтобы стоимость слияния не росла с числом блоков. Колонка, в которой
+    набралось больше max_values различных значений, переводится на скетч
+    (ColumnSketch: HyperLogLog и Count-Min с погрешностью error): точные
+    частоты переносятся в него и больше не хранятся, поэтому память не
+    растёт с числом строк.
+    """
+
+    def __init__(self, max_values=100_000, error=0.01, compact_every=16):
+        self.max_values = max_values
+        self.error = error
+        self.compact_every = compact_every
+        self.sketches = {}
+        self._parts = {}
+
+    def update(self, chunk):
+        for i, col in enumerate(chunk.columns):
+            if col in self.sketches:
+                self.sketches[col].update(chunk[col])
+                continue
+            parts = self._parts.setdefault(col, [])
+            parts.append(chunk[col].value_counts(dropna=False, sort=False))
+            if len(parts) >= self.compact_every or sum(len(part) for part in parts) > self.max_values:
+                combined = self._combine(parts)
+                if len(combined) > self.max_values:
+                    logging.info(f"Колонка {col}: больше {self.max_values} различных значений, "
+                                 f"частоты считаются приближённо (погрешность {self.error:.1%})")
+                    self.sketches[col] = ColumnSketch.from_counts(combined, self.error, seed=i)
+                    del self._parts[col]
+                else:
+                    self._parts[col] = [combined]
+
+    def counts(self, col):
+        """Итоговые частоты колонки, отсортированные по убыванию (None — колонка переведена на скетч)"""
+        if col in self.sketches:
+            return None
+        parts = self._parts.get(col, [])
+        if not parts:
+            return pd.Series(dtype='int64')
+        combined = self._combine(parts)
+        self._parts[col] = [combined]
+        return combined.sort_values(ascending=False, kind='stable')
+
+    @staticmethod
+    def _combine(parts):
+        if len(parts) == 1:
+            return parts[0]
+        return pd.concat(parts).groupby(level=0, dropna=False, sort=False).sum()
+
+
+class ReservoirSample:
+    """Равномерная выборка строк фиксированного размера (алгоритм R)"""
+
+    def __init__(self, n_cols, size=100000, seed=0):
+        self.size = size
+        self.seen = 0
+        self.values = np.empty((0, n_cols))
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        n = len(values)
+        free = self.size - len(self.values)
+        if free > 0:
+            self.values = np.vstack([self.values, values[:free]])
+            self.seen += min(free, n)
+            values = values[free:]
+            n = len(values)
+        if n == 0:
+            return
+        positions = self.seen + np.arange(1, n + 1)
+        slots = self._rng.integers(0, positions)
+        accepted = slots < self.size
+        self.values[slots[accepted]] = values[accepted]
+        self.seen += n
+
+
+class ChunkedStats:
+    """Статистики датасета, накапливаемые по блокам без материализации всей таблицы.
+
+    Если переданы скетчи (ApproximateStats), частоты значений считаются
+    по ним, а точные частоты не накапливаются. Иначе частоты точные для
+    колонок, в которых не больше max_values различных значений, и
+    приближённые (с погрешностью error) для остальных.
+    """
+
+    def __init__(self, sample_size=100000, sketches=None, max_values=100_000, error=0.01):
+        self.sample_size = sample_size
+        self.sketches = sketches
+        self.rows = 0
+        self.chunks = 0
+        self.columns = None
+        self.dtypes = None
+        self.numeric_cols = []
+        self.non_null = None
+        self.filled = None
+        self.moments = None
+        self.comoments = None
+        self.sample = None
+        self.value_counts = ValueCountAccumulator(max_values, error)
+        self._coerced = set()
+
+    def update(self, chunk, filled_counts=None):
+        """Учёт очередного блока данных"""
+        if self.columns is None:
+            self._init_from(chunk)
+        else:
+            for col in self.columns:
+                self.dtypes[col] = _merge_dtype(self.dtypes[col], chunk[col].dtype)
+
+        self.rows += len(chunk)
+        self.chunks += 1
+        self.non_null += chunk.notna().sum()
+        if filled_counts is not None:
+            self.filled += filled_counts
+
+        if self.numeric_cols:
+            values = self._numeric_block(chunk)
+            self.moments.update(values)
+            self.comoments.update(values)
+            self.sample.update(values)
+        if self.sketches is not None:
+            self.sketches.update(chunk)
+        else:
+            self.value_counts.update(chunk)
+
+    def _init_from(self, chunk):
+        self.columns = list(chunk.columns)
+        self.dtypes = chunk.dtypes.to_dict()
+        self.numeric_cols = list(chunk.select_dtypes(include=[np.number]).columns)
+        self.non_null = pd.Series(0, index=chunk.columns, dtype='int64')
+        self.filled = pd.Series(0, index=chunk.columns, dtype='int64')
+        k = len(self.numeric_cols)
+        self.moments = RunningMoments(k)
+        self.comoments = CoMomentMatrix(k)
+        self.sample = ReservoirSample(k, size=self.sample_size)
+
+    def _numeric_block(self, chunk):
+        block = chunk[self.numeric_cols]
+        for col in self.numeric_cols:
+            if not pd.api.types.is_numeric_dtype(block[col]):
+                if col not in self._coerced:
+                    self._coerced.add(col)
+                    logging.warning(f"Колонка {col} содержит нечисловые значения, они будут пропущены")
+                block = block.assign(**{col: pd.to_numeric(block[col], errors='coerce')})
+        return block.to_numpy(dtype=float, na_value=np.nan)
+
+    def fill_ratio(self):
+        """Общая заполненность (в процентах)"""
+        total_cells = self.rows * len(self.columns or [])
+        if total_cells == 0:
+            return 0.0
+        return float(self.filled.sum() / total_cells * 100)
+
+    def info(self):
+        """Текстовое описание в формате, близком к DataFrame.info()"""
+        buffer = io.StringIO()
+        buffer.write("Потоковый режим: данные не загружены в память целиком\n")
+        buffer.write(f"Обработано блоков: {self.chunks}\n")
+        buffer.write(f"RangeIndex: {self.rows} entries\n")
+        buffer.write(f"Data columns (total {len(self.columns)} columns):\n")
+        width = max([len(str(c)) for c in self.columns] + [6])
+        buffer.write(f" #   {'Column':<{width}}  Non-Null Count  Dtype\n")
+        for i, col in enumerate(self.columns):
+            buffer.write(f" {i:<3} {str(col):<{width}}  {self.non_null[col]:>8} non-null  {self.dtypes[col]}\n")
+        return buffer.getvalue()
+
+    def describe(self):
+        """Аналог DataFrame.describe() для числовых колонок.
+
+        count, mean, std, min и max точные; квартили оцениваются по
+        равномерной выборке строк.
+        """
+        if not self.numeric_cols:
+            return pd.DataFrame()
+        sample = self.sample.values
+        with _ignore_all_nan_warnings():
+            quartiles = (np.nanquantile(sample, [0.25, 0.5, 0.75], axis=0)
+                         if len(sample) else np.full((3, len(self.numeric_cols)), np.nan))
+        data = np.vstack([
+            self.moments.count,
+            np.where(self.moments.count > 0, self.moments.mean, np.nan),
+            self.moments.std,
+            self.moments.min,
+            quartiles,
+            self.moments.max,
+        ])
+        index = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+        return pd.DataFrame(data, index=index, columns=self.numeric_cols)
+
+    def correlations(self):
+        """Пирсон по ко-моментам (точно), Спирмен по выборке строк (приближённо)"""
+        if not self.numeric_cols:
+            return None, None
+        pearson = pd.DataFrame(self.comoments.correlation(),
+                               index=self.numeric_cols, columns=self.numeric_cols)
+        spearman = self.sample_frame().corr(method='spearman')
+        return pearson, spearman
+
+    def sample_frame(self):
+        """Выборка строк числовых колонок в виде DataFrame"""
+        return pd.DataFrame(self.sample.values, columns=self.numeric_cols)
+
+
+
+def _merge_dtype(current, new):
+    """Общий тип колонки для двух блоков"""
+    if current == new:
+        return current
+    if (isinstance(current, np.dtype) and isinstance(new, np.dtype)
+            and pd.api.types.is_numeric_dtype(current) and pd.api.types.is_numeric_dtype(new)):
+        return np.result_type(current, new)
+    return np.dtype(object)
+
+
+@contextmanager
+def _ignore_all_nan_warnings():
+    """Подавление RuntimeWarning для колонок, целиком состоящих из NaN"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        yield
@@ -0,0 +1,71 @@
+import logging
+import time
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+
+class WorkerCancelled(BaseException):
+    """Операция отменена пользователем.
+
+    Наследуется от BaseException, чтобы не перехватываться обработчиками
+    `except Exception` внутри модели.
+    """
+
+
+class WorkerSignals(QObject):
+    """Сигналы фоновой задачи (доставляются в главный поток)"""
+    progress = pyqtSignal(float, str)
+    section_ready = pyqtSignal(str, object)
+    error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+
+class PipelineWorker(QRunnable):
+    """Выполнение конвейера загрузки и анализа в пуле потоков Qt.
+
+    Задача получает сам воркер и сообщает через него о прогрессе
+    и готовых разделах; при отмене очередной вызов report_progress,
+    emit_section или check_cancelled прерывает выполнение.
+    """
+
+    def __init__(self, task, progress_interval=0.1):
+        super().__init__()
+        self.task = task
+        self.signals = WorkerSignals()
+        self._cancelled = False
+        self._progress_interval = progress_interval
+        self._last_progress = 0.0
+
+    def cancel(self):
+        """Запрос отмены (обрабатывается в фоновом потоке)"""
+        self._cancelled = True
+
+    def check_cancelled(self):
+        if self._cancelled:
+            raise WorkerCancelled()
+
+    def report_progress(self, fraction, message=''):
+        """Отправка прогресса не чаще, чем раз в progress_interval секунд"""
+        self.check_cancelled()
+        now = time.monotonic()
+        if fraction < 1.0 and now - self._last_progress < self._progress_interval:
+            return
+        self._last_progress = now
+        self.signals.progress.emit(float(fraction), message)
+
+    def emit_section(self, name, data):
+        """Передача готового раздела анализа в главный поток"""
+        self.check_cancelled()
+        self.signals.section_ready.emit(name, data)
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            self.task(self)
+        except WorkerCancelled:
+            logging.info("Операция отменена пользователем")
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        finally:
+            self.signals.finished.emit()
@@ -1,20 +1,65 @@
 import logging
 import io
-import seaborn as sns
-import matplotlib.pyplot as plt
+from PyQt6.QtCore import QThreadPool
 from models.data_model import DataModel
+from models.correlation import top_pairs
+from models.column_stats import format_summary
+from presenters.analysis_worker import PipelineWorker
 
 class DataPresenter:
     def __init__(self, view):
         self.view = view
         self.model = DataModel()
+        self.thread_pool = QThreadPool.globalInstance()
+        self.worker = None
+        self.worker_failed = False
+        # Параметры предобработки изменены во время работы фоновой задачи
+        self.options_pending = False
+        # Графики вкладки: описания и очередь запрошенных к отрисовке (отдельный фоновый поток)
+        self.plot_specs = []
+        self.plot_queue = []
+        self.plot_worker = None
+        
+        # Вкладки считаются лениво: при первом открытии, результат кэшируется до смены данных
+        self.analysis_options = {}
+        self.section_cache = {}
+        self.section_builders = {
+            'info': self._build_info,
+            'describe': self._build_describe,
+            'correlations': self._build_correlations,
+            'unique': self._build_unique,
+            'value_counts': self._build_value_counts,
+            'graphs': self._build_graphs,
+        }
+        self.tab_sections = {
+            self.view.info_tab: 'info',
+            self.view.describe_tab: 'describe',
+            self.view.corr_tab: 'correlations',
+            self.view.unique_tab: 'unique',
+            self.view.value_counts_tab: 'value_counts',
+            self.view.graphs_tab: 'graphs',
+        }
         self.setup_connections()
         
     def setup_connections(self):
         """Установка связей между сигналами и слотами"""
         self.view.load_btn.clicked.connect(self.load_data)
         self.view.save_btn.clicked.connect(self.save_data)
+        self.view.save_model_btn.clicked.connect(self.save_model)
+        self.view.apply_model_btn.clicked.connect(self.apply_model)
+        self.view.cancel_btn.clicked.connect(self.cancel)
+        self.view.tabs.currentChanged.connect(self.on_tab_changed)
+        self.view.graphs_list.render_requested.connect(self.on_plots_requested)
         self.view.zero_values_input.textChanged.connect(self.update_zero_values)
+        self.view.normalize_cb.toggled.connect(self.on_options_changed)
+        self.view.encoding_combo.currentTextChanged.connect(self.on_options_changed)
+        self.view.max_categories_spin.valueChanged.connect(self.on_options_changed)
+        self.view.other_bucket_cb.toggled.connect(self.on_options_changed)
+        self.view.approximate_cb.toggled.connect(self.on_options_changed)
+        self.view.approximate_error_spin.valueChanged.connect(self.on_options_changed)
+        self.view.top_n_spin.valueChanged.connect(self.on_top_n_changed)
+        self.view.unique_page_btn.clicked.connect(self.show_unique_page)
+        self.view.value_counts_page_btn.clicked.connect(self.show_value_counts_page)
         
     def update_zero_values(self):
         """Обновление списка символов для нулей"""
@@ -24,164 +69,379 @@ class DataPresenter:
         
     def load_data(self):
         """Загрузка данных"""
-        self.view.zero_values_input.textChanged.connect(self.update_zero_values)
         file_name, _ = self.view.get_open_file_name()
         if not file_name:
             return
-            
-        try:
-            self.model.load_data(file_name)
-            self.analyze_data()
-        except ValueError as e:
-            self.view.show_error("Ошибка", str(e))
-        except Exception as e:
-            self.view.show_error("Ошибка", f"Ошибка при загрузке файла:\n{str(e)}")
-            
+        
+        self.model.chunk_size = self.view.get_chunk_size()
+        self.model.optimize_memory = self.view.optimize_memory_cb.isChecked()
+        self._apply_stats_settings()
+        options = self._analysis_options()
+        self.invalidate_sections()
+        self.start_worker(lambda worker: self._load_and_analyze(worker, file_name, options))
+        
     def save_data(self):
         """Сохранение данных"""
-        if self.model.df is None:
+        if not self.model.has_data():
             self.view.show_warning("Внимание", "Нет данных для сохранения!")
             return
-            
+        
         file_name, _ = self.view.get_save_file_name()
         if not file_name:
             return
-            
+        
         try:
             self.model.save_data(file_name)
             self.view.show_info("Успех", "Датасет успешно сохранён!")
         except Exception as e:
             self.view.show_error("Ошибка", f"Ошибка при сохранении файла: {str(e)}")
             
-    def analyze_data(self):
-        self.view.zero_values_input.textChanged.connect(self.update_zero_values)
-        """Анализ данных"""
+    def save_model(self):
+        """Сохранение обученной модели предобработки"""
         if self.model.df is None:
-            self.view.show_warning("Внимание", "Пожалуйста, сначала загрузите датасет!")
+            self.view.show_warning("Внимание", "Модель обучается при предобработке загруженного датасета!")
             return
-            
+        
+        file_name, _ = self.view.get_model_save_file_name()
+        if not file_name:
+            return
+        if not file_name.endswith('.json.gz'):
+            file_name += '.json.gz'
+        
         try:
-            # Предобработка данных
-            self.model.preprocess_data(
-                normalize=self.view.normalize_cb.isChecked(),
-                encoding_type=self.view.encoding_combo.currentText()
-            )
-            
-            # Очистка предыдущих графиков
-            self.view.clear_graphs()
-            
-            # Вывод df.info()
-            info_text = self.model.get_data_info()
-            if info_text:
-                self.view.info_text.setText(info_text)
+            self.model.save_preprocessing_model(file_name)
+            self.view.show_info("Успех", "Модель предобработки успешно сохранена!")
+        except Exception as e:
+            self.view.show_error("Ошибка", f"Ошибка при сохранении модели: {str(e)}")
             
-            # Вывод df.describe()
-            describe_df = self.model.get_data_describe()
-            if self.view.normalize_cb.isChecked():
-                describe_df = describe_df.round(4)
-            self.view.describe_text.setText(str(describe_df))
+    def apply_model(self):
+        """Применение сохранённой модели к новому файлу (в фоновом потоке)"""
+        model_file, _ = self.view.get_model_open_file_name()
+        if not model_file:
+            return
+        input_file, _ = self.view.get_open_file_name()
+        if not input_file:
+            return
+        output_file, _ = self.view.get_save_file_name()
+        if not output_file:
+            return
+        
+        self.start_worker(
+            lambda worker: worker.emit_section('apply_model', self.model.apply_preprocessing_model(
+                model_file, input_file, output_file, progress_callback=worker.report_progress)),
+            message="Применение модели...")
             
-            # Анализ корреляций
-            pearson_corr, spearman_corr = self.model.get_correlations()
-            if pearson_corr is not None:
-                corr_report = []
-                corr_report.append("=== ЛИНЕЙНЫЕ КОРРЕЛЯЦИИ ===")
-                corr_pairs = []
-                
-                for i in range(len(pearson_corr.columns)):
-                    for j in range(i+1, len(pearson_corr.columns)):
-                        corr_pairs.append((
-                            pearson_corr.columns[i],
-                            pearson_corr.columns[j],
-                            pearson_corr.iloc[i, j]
-                        ))
-                
-                corr_pairs.sort(key=lambda x: abs(x[2]), reverse=True)
-                for pair in corr_pairs[:5]:
-                    corr_report.append(f"{pair[0]} - {pair[1]}: {pair[2]:.3f}")
-                
-                corr_report.append("\n=== НЕЛИНЕЙНЫЕ КОРРЕЛЯЦИИ (СПИРМЕН) ===")
-                spearman_pairs = []
-                
-                for i in range(len(spearman_corr.columns)):
-                    for j in range(i+1, len(spearman_corr.columns)):
-                        spearman_pairs.append((
-                            spearman_corr.columns[i],
-                            spearman_corr.columns[j],
-                            spearman_corr.iloc[i, j]
-                        ))
-                
-                spearman_pairs.sort(key=lambda x: abs(x[2]), reverse=True)
-                for pair in spearman_pairs[:5]:
-                    corr_report.append(f"{pair[0]} - {pair[1]}: {pair[2]:.3f}")
-                
-                self.view.corr_text.setText("\n".join(corr_report))
-                
-                # Построение тепловой карты
-                fig = plt.figure(figsize=(10, 8))
-                ax = fig.add_subplot(111)
-                sns.heatmap(pearson_corr, annot=True, cmap='coolwarm', ax=ax, fmt='.2f',
-                           annot_kws={'size': 8}, cbar_kws={'label': 'Корреляция'})
-                plt.title('Тепловая карта корреляций', pad=20, fontsize=12)
-                plt.xticks(rotation=45, ha='right')
-                plt.yticks(rotation=0)
-                plt.tight_layout()
-                self.view.add_graph(fig)
-                
-                # Построение гистограмм и бокс-плотов
-                numeric_df = self.model.df.select_dtypes(include=['number'])
-                for col in numeric_df.columns:
-                    # Гистограмма
-                    fig = plt.figure(figsize=(10, 5))
-                    ax = fig.add_subplot(111)
-                    sns.histplot(data=numeric_df, x=col, ax=ax, kde=True)
-                    ax.set_title(f'Распределение {col}', pad=20, fontsize=12)
-                    ax.set_xlabel(col, fontsize=10)
-                    ax.set_ylabel('Частота', fontsize=10)
-                    plt.xticks(rotation=45, ha='right')
-                    plt.tight_layout()
-                    self.view.add_graph(fig)
-                    
-                    # Бокс-плот
-                    fig = plt.figure(figsize=(10, 5))
-                    ax = fig.add_subplot(111)
-                    sns.boxplot(data=numeric_df, y=col, ax=ax)
-                    ax.set_title(f'Бокс-плот {col}', pad=20, fontsize=12)
-                    ax.set_ylabel(col, fontsize=10)
-                    plt.tight_layout()
-                    self.view.add_graph(fig)
+    def analyze_data(self):
+        """Анализ данных"""
+        if not self.model.has_data():
+            self.view.show_warning("Внимание", "Пожалуйста, сначала загрузите датасет!")
+            return
+        
+        options = self._analysis_options()
+        self._apply_stats_settings()
+        self.invalidate_sections()
+        self.start_worker(lambda worker: self._analyze(worker, options))
+        
+    def on_options_changed(self, *args):
+        """Повторная предобработка исходных данных с новыми параметрами"""
+        if not self.model.has_data() or self.model.chunked_stats is not None:
+            return
+        if self.worker is not None:
+            self.options_pending = True
+            return
+        self.analyze_data()
+        
+    def on_top_n_changed(self, value):
+        """Новое число выводимых значений: пересчитываются только вкладки значений"""
+        if self.worker is not None:
+            self.options_pending = True
+            return
+        self.model.top_n = value
+        for name in ('unique', 'value_counts'):
+            self.section_cache.pop(name, None)
+        self.on_tab_changed(self.view.tabs.currentIndex())
+        
+    def show_unique_page(self):
+        """Страница полного списка уникальных значений выбранной колонки"""
+        self._show_page('unique_page', self.view.unique_page_column, self.view.unique_page_spin,
+                        self.model.get_unique_page)
+                        
+    def show_value_counts_page(self):
+        """Страница полного списка частот выбранной колонки"""
+        self._show_page('value_counts_page', self.view.value_counts_page_column,
+                        self.view.value_counts_page_spin, self.model.get_value_counts_page)
+                        
+    def _show_page(self, name, column_combo, page_spin, get_page):
+        """Загрузка страницы в фоновом потоке (полный список считается только по запросу)"""
+        index = column_combo.currentIndex()
+        if index < 0 or not self.model.has_data():
+            return
+        col = self.model.get_column_names()[index]
+        page = page_spin.value() - 1
+        self.start_worker(
+            lambda worker: worker.emit_section(name, self._build_page(get_page, col, page)),
+            message="Загрузка страницы...")
+        
+    def on_plots_requested(self, indices):
+        """Отрисовка графиков, попавших в область просмотра"""
+        self.plot_queue.extend(indices)
+        self._start_plot_worker()
+        
+    def _start_plot_worker(self):
+        """Запуск отрисовки очереди графиков (не блокирует остальные операции)"""
+        if self.plot_worker is not None or not self.plot_queue:
+            return
+        indices, self.plot_queue = self.plot_queue, []
+        specs = self.plot_specs
+        renderer = self.model.plot_renderer
+        # Отмена проверяется после каждого готового графика
+        self.plot_worker = PipelineWorker(lambda worker: worker.emit_section(
+            'plots', (specs, indices, renderer.render(
+                [specs[i] for i in indices], progress_callback=lambda fraction: worker.check_cancelled()))))
+        self.plot_worker.signals.section_ready.connect(self.on_plots_rendered)
+        self.plot_worker.signals.error.connect(
+            lambda message: self.view.show_error("Ошибка", f"Не удалось построить графики: {message}"))
+        self.plot_worker.signals.finished.connect(lambda: self.on_plot_worker_finished(specs, indices))
+        self.thread_pool.start(self.plot_worker)
+        
+    def on_plots_rendered(self, name, data):
+        specs, indices, images = data
+        # Результаты для прежних данных не выводим
+        if specs is not self.plot_specs:
+            return
+        for index, image in zip(indices, images):
+            self.view.graphs_list.set_image(index, image)
             
-            # Заполнение вкладки с уникальными значениями
-            unique_values = self.model.get_unique_values()
-            if unique_values:
-                unique_report = []
-                for col, values in unique_values.items():
-                    unique_report.append(f"\n=== {col} ===")
-                    unique_report.append(f"Количество уникальных значений: {len(values)}")
-                    unique_report.append("Значения:")
-                    unique_report.append(str(values))
-                self.view.unique_text.setText("\n".join(unique_report))
+    def on_plot_worker_finished(self, specs, indices):
+        self.plot_worker = None
+        # Список графиков мог быть уже заменён новым
+        if specs is self.plot_specs:
+            self.view.graphs_list.render_failed(indices)
+        self._start_plot_worker()
+        
+    def start_worker(self, task, message="Загрузка..."):
+        """Запуск задачи в фоновом потоке"""
+        if self.worker is not None:
+            logging.warning("Предыдущая операция ещё выполняется")
+            return
+        
+        self.view.set_busy(True, message)
+        self.worker_failed = False
+        
+        self.worker = PipelineWorker(task)
+        self.worker.signals.progress.connect(self.view.show_progress)
+        self.worker.signals.section_ready.connect(self.on_section_ready)
+        self.worker.signals.error.connect(self.on_worker_error)
+        self.worker.signals.cancelled.connect(self.on_worker_cancelled)
+        self.worker.signals.finished.connect(self.on_worker_finished)
+        self.thread_pool.start(self.worker)
+        
+    def cancel(self):
+        """Отмена текущей операции"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.view.show_progress(0.0, "Отмена...")
+        self.cancel_plots()
+        
+    def cancel_plots(self):
+        """Отмена отрисовки графиков (их можно запросить снова прокруткой)"""
+        self.view.graphs_list.render_failed(self.plot_queue)
+        self.plot_queue = []
+        if self.plot_worker is not None:
+            self.plot_worker.cancel()
             
-            # Заполнение вкладки с value counts
-            value_counts = self.model.get_value_counts()
-            if value_counts:
-                value_counts_report = []
-                for col, counts in value_counts.items():
-                    value_counts_report.append(f"\n=== {col} ===")
-                    value_counts_report.append(str(counts))
-                self.view.value_counts_text.setText("\n".join(value_counts_report))
+    def invalidate_sections(self):
+        """Сброс результатов вкладок при изменении данных"""
+        self.section_cache.clear()
+        self.cancel_plots()
+        self.plot_specs = []
+        self.view.clear_results()
+        
+    def on_tab_changed(self, index):
+        """Расчёт раздела при первом открытии вкладки"""
+        self.ensure_section(self.tab_sections.get(self.view.tabs.widget(index)))
+        
+    def ensure_section(self, name):
+        """Запуск расчёта раздела, если он ещё не в кэше"""
+        # Разделы считаются только после загрузки и предобработки (раздел info)
+        if name is None or name in self.section_cache or 'info' not in self.section_cache:
+            return
+        if self.worker is not None:
+            # Текущая вкладка будет досчитана по завершении работающей задачи
+            return
+        
+        builder = self.section_builders[name]
+        options = self.analysis_options
+        self.start_worker(
+            lambda worker: worker.emit_section(name, self._build_section(builder, options)),
+            message="Расчёт вкладки...")
             
-            logging.info("Анализ данных завершён")
+    def on_section_ready(self, name, data):
+        """Вывод готового раздела анализа (в главном потоке)"""
+        if name == 'apply_model':
+            self.view.show_info("Успех", f"Модель применена, сохранено строк: {data}")
+            return
+        if name == 'export_html':
+            self.view.show_info("Успех", "Данные успешно экспортированы в HTML")
+            return
+        if name in ('unique_page', 'value_counts_page'):
+            text, pages = data
+            if name == 'unique_page':
+                self.view.show_page(self.view.unique_page_spin, self.view.unique_page_text, text, pages)
+            else:
+                self.view.show_page(self.view.value_counts_page_spin, self.view.value_counts_page_text,
+                                    text, pages)
+            return
+        if name == 'info':
+            self.view.set_page_columns(self.model.get_column_names())
+        self.section_cache[name] = data
+        if name == 'graphs':
+            self.plot_specs = data
+            self.view.set_graphs([(spec.title, spec.figsize) for spec in data])
+            return
+        text_widgets = {
+            'info': self.view.info_text,
+            'describe': self.view.describe_text,
+            'correlations': self.view.corr_text,
+            'unique': self.view.unique_text,
+            'value_counts': self.view.value_counts_text,
+        }
+        text_widgets[name].setText(data)
+        
+    def on_worker_error(self, message):
+        self.worker_failed = True
+        self.view.show_error("Ошибка", message)
+        
+    def on_worker_cancelled(self):
+        self.worker_failed = True
+        self.view.show_info("Отмена", "Операция отменена")
+        
+    def on_worker_finished(self):
+        self.worker = None
+        self.view.set_busy(False)
+        self.view.hide_progress()
+        if self.options_pending and not self.worker_failed:
+            self.options_pending = False
+            self.analyze_data()
+            return
+        self.options_pending = False
+        if not self.worker_failed:
+            self.on_tab_changed(self.view.tabs.currentIndex())
             
+    def _analysis_options(self):
+        """Параметры предобработки из интерфейса (читаются в главном потоке)"""
+        return {
+            'normalize': self.view.normalize_cb.isChecked(),
+            'encoding_type': self.view.encoding_combo.currentText(),
+            'max_categories': self.view.max_categories_spin.value(),
+            'other_bucket': self.view.other_bucket_cb.isChecked(),
+        }
+        
+    def _apply_stats_settings(self):
+        """Режим приближённых статистик и число значений из интерфейса (до запуска фоновой задачи)"""
+        self.model.top_n = self.view.top_n_spin.value()
+        error = self.view.get_approximate_error()
+        self.model.approximate_stats = error is not None
+        if error is not None:
+            self.model.approximate_error = error
+        
+    def _load_and_analyze(self, worker, file_name, options):
+        """Загрузка файла и анализ (выполняется в фоновом потоке)"""
+        try:
+            self.model.load_data(file_name, progress_callback=worker.report_progress)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Ошибка при загрузке файла:\n{str(e)}") from e
+        self._analyze(worker, options)
+        
+    def _analyze(self, worker, options):
+        """Предобработка и вывод df.info() — остальные вкладки считаются по запросу"""
+        self.analysis_options = options
+        worker.report_progress(1.0, "Предобработка данных")
+        info_text = self._build_section(self._build_info, options, preprocess=True)
+        worker.emit_section('info', info_text or '')
+        
+    def _build_section(self, builder, options, preprocess=False):
+        """Расчёт раздела с единообразной обработкой ошибок (в фоновом потоке)"""
+        try:
+            if preprocess:
+                self.model.preprocess_data(**options)
+            return builder(options)
         except Exception as e:
             error_msg = f"Ошибка при анализе данных: {str(e)}"
-            self.view.show_error("Ошибка", error_msg)
             logging.error(error_msg)
+            raise RuntimeError(error_msg) from e
             
+    def _build_info(self, options):
+        """Вывод df.info()"""
+        return self.model.get_data_info()
+        
+    def _build_describe(self, options):
+        """Вывод df.describe()"""
+        describe_df = self.model.get_data_describe()
+        if options['normalize']:
+            describe_df = describe_df.round(4)
+        return str(describe_df)
+        
+    def _build_correlations(self, options):
+        """Анализ корреляций"""
+        pearson_corr, spearman_corr = self.model.get_correlations()
+        if pearson_corr is None:
+            return ''
+        
+        corr_report = []
+        corr_report.append("=== ЛИНЕЙНЫЕ КОРРЕЛЯЦИИ ===")
+        # Пять самых сильных пар (без сортировки всех пар)
+        for col1, col2, value in top_pairs(pearson_corr, 5):
+            corr_report.append(f"{col1} - {col2}: {value:.3f}")
+        
+        corr_report.append("\n=== НЕЛИНЕЙНЫЕ КОРРЕЛЯЦИИ (СПИРМЕН) ===")
+        for col1, col2, value in top_pairs(spearman_corr, 5):
+            corr_report.append(f"{col1} - {col2}: {value:.3f}")
+        
+        return "\n".join(corr_report)
+        
+    def _build_graphs(self, options):
+        """Описания графиков: тепловая карта, гистограммы и бокс-плоты (рисуются при прокрутке)"""
+        return self.model.get_plot_specs()
+        
+    def _build_unique(self, options):
+        """Заполнение вкладки с уникальными значениями (число значений и первые top N)"""
+        unique_values = self.model.get_unique_values()
+        if not unique_values:
+            return ''
+        unique_report = []
+        for col, summary in unique_values.items():
+            unique_report.append(f"\n=== {col} ===")
+            unique_report.append(format_summary(summary))
+        return "\n".join(unique_report)
+        
+    def _build_value_counts(self, options):
+        """Заполнение вкладки с value counts (число значений и top N самых частых)"""
+        value_counts = self.model.get_value_counts()
+        if not value_counts:
+            return ''
+        value_counts_report = []
+        for col, summary in value_counts.items():
+            value_counts_report.append(f"\n=== {col} ===")
+            value_counts_report.append(format_summary(summary, counts=True))
+        return "\n".join(value_counts_report)
+        
+    def _build_page(self, get_page, col, page):
+        """Текст страницы полного списка и число страниц"""
+        values, pages = get_page(col, page)
+        page = min(page, pages - 1)
+        header = f"=== {col}: страница {page + 1} из {pages} ==="
+        return f"{header}\n{values.to_string()}", pages
+        
     def export_to_html(self, file_name):
-        """Экспорт данных в HTML"""
-        self.model.export_to_html(file_name)
+        """Экспорт данных в HTML (в фоновом потоке: графики рисуются в 300 dpi)"""
+        self.start_worker(
+            lambda worker: worker.emit_section('export_html', self.model.export_to_html(
+                file_name, progress_callback=worker.report_progress)),
+            message="Экспорт в HTML...")
         
     def export_to_text(self, file_name):
         """Экспорт данных в текст"""
-        self.model.export_to_text(file_name) 
\ No newline at end of file
+        self.model.export_to_text(file_name)
@@ -0,0 +1,20 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.column_stats import ColumnStatsEngine
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_describe_with_datetime_matches_pandas(workers):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'x': rng.normal(size=100),
+        'when': pd.date_range('2020-01-01', periods=100, freq='D'),
+        'n': rng.integers(0, 10, 100),
+        'name': rng.choice(list('abc'), 100),
+    })
+    df.loc[::10, 'when'] = pd.NaT
+
+    engine = ColumnStatsEngine(workers=workers, min_cells=0)
+    pd.testing.assert_frame_equal(engine.describe(df), df.describe())
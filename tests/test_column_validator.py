@@ -0,0 +1,50 @@
+import mmap
+
+import pytest
+
+from models.column_validator import ColumnCountValidator
+
+
+def validate(data, method='feed'):
+    validator = ColumnCountValidator()
+    getattr(validator, method)(data)
+    validator.close()
+    return validator
+
+
+@pytest.mark.parametrize('method', ['feed', 'feed_buffer'])
+def test_stray_quote_in_unquoted_field(method):
+    # Кавычка не в начале поля — обычный символ, а не начало многострочной записи
+    validator = validate(b'name,height\nBob,11"\nAl,3\n', method)
+    assert validator.invalid_rows == []
+    assert validator.rows_checked == 2
+
+
+@pytest.mark.parametrize('method', ['feed', 'feed_buffer'])
+def test_quoted_fields_with_escapes_and_newlines(method):
+    data = b'name,note\n"Bob ""B"", jr",1\n"multi\nline, ""q""\nend",2\nAl,3\n'
+    validator = validate(data, method)
+    assert validator.invalid_rows == []
+    assert validator.rows_checked == 3
+
+
+@pytest.mark.parametrize('method', ['feed', 'feed_buffer'])
+def test_unclosed_quote_is_reported(method):
+    validator = validate(b'name,note\nBob,1\n"open,2\nAl,3\n', method)
+    assert validator.invalid_rows == [3]
+
+
+def test_feed_buffer_releases_mapping_on_cancel(tmp_path):
+    class Cancelled(BaseException):
+        pass
+
+    def cancel(fraction):
+        raise Cancelled()
+
+    path = tmp_path / 'data.csv'
+    path.write_bytes(b'a,b\n' + b'1,2\n' * 1000)
+    with open(path, 'rb') as f:
+        # Выход из with закрывает отображение: при неосвобождённом буфере — BufferError
+        with pytest.raises(Cancelled):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                ColumnCountValidator().feed_buffer(mapped, block_size=64, progress_callback=cancel)
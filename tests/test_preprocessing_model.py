@@ -0,0 +1,39 @@
+import pandas as pd
+
+from models.preprocessing_model import PreprocessingModel
+
+
+def fit_model(df):
+    model = PreprocessingModel()
+    df = model.fit_nulls(df, ['-'])
+    df = model.fit_imputer(df)
+    df = model.fit_scaler(df, normalize=True)
+    model.fit_encoder(df, 'Числовое кодирование')
+    return model
+
+
+def test_datetime_values_survive_save_and_load(tmp_path):
+    when = pd.to_datetime(['2021-03-01 10:30', '2021-03-01 10:30', None, '2022-01-15 08:00'])
+    df = pd.DataFrame({
+        'when': when,
+        'value': [1.0, None, 3.0, 4.0],
+        'kind': ['a', '-', 'b', 'a'],
+    })
+    model = fit_model(df)
+    path = tmp_path / 'model.json.gz'
+    model.save(path)
+    loaded = PreprocessingModel.load(path)
+
+    # Мода колонки дат загружается датой, а не строкой
+    assert loaded.imputer.fill_values['when'] == pd.Timestamp('2021-03-01 10:30')
+    assert isinstance(loaded.imputer.fill_values['when'], pd.Timestamp)
+
+    new = pd.DataFrame({
+        'when': pd.to_datetime([None, '2023-06-30 12:00']),
+        'value': [None, 2.0],
+        'kind': ['b', None],
+    })
+    result = loaded.transform(new)
+    pd.testing.assert_frame_equal(result, model.transform(new))
+    assert result['when'].dtype == new['when'].dtype
+    assert result['when'].iloc[0] == pd.Timestamp('2021-03-01 10:30')
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from models.streaming_stats import ValueCountAccumulator
+
+
+def test_value_counts_switch_to_sketch_above_max_values():
+    rng = np.random.default_rng(0)
+    rows = 60000
+    ids = np.array([f'id{i}' for i in range(rows)], dtype=object)
+    ids[:10000:2] = 'hot'
+    df = pd.DataFrame({'id': ids, 'c': rng.choice(list('abc'), rows)})
+
+    accumulator = ValueCountAccumulator(max_values=5000, error=0.01)
+    for start in range(0, rows, 6000):
+        accumulator.update(df.iloc[start:start + 6000])
+
+    # Колонка с небольшим числом значений считается точно
+    expected = df['c'].value_counts()
+    assert accumulator.counts('c').sort_index().equals(expected.sort_index())
+
+    # Колонка-идентификатор переведена на скетч, точные частоты не хранятся
+    assert accumulator.counts('id') is None
+    summary = accumulator.sketches['id'].value_counts_summary(top_n=3)
+    assert summary.rows == rows
+    assert abs(summary.distinct - df['id'].nunique()) <= 3 * summary.distinct_error * df['id'].nunique()
+    # Частое значение встретилось только до перехода на скетч, но сохраняется в нём
+    assert list(summary.top.index) == ['hot']
+    assert 5000 <= summary.top['hot'] <= 5000 + summary.count_error
@@ -1,13 +1,14 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                             QPushButton, QLabel, QFileDialog, QCheckBox, 
                             QComboBox, QTextEdit, QMessageBox, QTabWidget, 
-                            QScrollArea, QLineEdit, QFrame, QTableWidget)
+                            QLineEdit, QFrame, QTableWidget,
+                            QSpinBox, QDoubleSpinBox, QProgressBar)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 import seaborn as sns
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 import os
+from views.plot_list import PlotList
 
 class MainView(QMainWindow):
     def __init__(self):
@@ -30,6 +31,9 @@ class MainView(QMainWindow):
         # Верхняя панель
         self.setup_top_panel(layout)
         
+        # Индикатор прогресса загрузки
+        self.setup_progress_bar(layout)
+        
         # Вкладки
         self.setup_tabs(layout)
         
@@ -214,21 +218,223 @@ class MainView(QMainWindow):
         # Выбор типа кодирования
         encoding_label = QLabel('Кодирование:')
         self.encoding_combo = QComboBox()
-        self.encoding_combo.addItems(['Без кодирования', 'Числовое кодирование', 'One-Hot кодирование'])
+        self.encoding_combo.addItems(['Без кодирования', 'Числовое кодирование', 'One-Hot кодирование',
+                                      'Разреженное One-Hot кодирование'])
         self.encoding_combo.setToolTip(
             "Без кодирования: оставляет данные как есть\n"
             "Числовое кодирование: преобразует категории в числа\n"
-            "One-Hot кодирование: создает бинарные колонки для каждой категории"
+            "One-Hot кодирование: создает бинарные колонки (uint8) для каждой категории\n"
+            "Разреженное One-Hot кодирование: то же, но колонки хранят только единицы"
         )
         top_layout.addWidget(encoding_label)
         top_layout.addWidget(self.encoding_combo)
         
+        # Предел числа категорий для one-hot и top-K с колонкой «Прочее»
+        categories_container = QWidget()
+        categories_layout = QVBoxLayout(categories_container)
+        categories_layout.setSpacing(1)
+        categories_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.max_categories_spin = QSpinBox()
+        self.max_categories_spin.setRange(2, 1000)
+        self.max_categories_spin.setValue(10)
+        self.max_categories_spin.setPrefix('до ')
+        self.max_categories_spin.setSuffix(' категорий')
+        self.max_categories_spin.setToolTip("Колонки с большим числом категорий не кодируются one-hot")
+        self.other_bucket_cb = QCheckBox('Остальные в «Прочее»')
+        self.other_bucket_cb.setToolTip(
+            "Колонки с большим числом категорий кодируются по самым частым\n"
+            "категориям, остальные значения попадают в колонку «Прочее»"
+        )
+        
+        categories_layout.addWidget(self.max_categories_spin)
+        categories_layout.addWidget(self.other_bucket_cb)
+        top_layout.addWidget(categories_container)
+        
+        self.optimize_memory_cb = QCheckBox('Сжатие типов')
+        self.optimize_memory_cb.setToolTip(
+            "После загрузки строковые колонки с повторяющимися значениями\n"
+            "переводятся в category, числа — в типы меньшей разрядности.\n"
+            "Объём памяти до и после выводится на вкладке информации."
+        )
+        top_layout.addWidget(self.optimize_memory_cb)
+        
+        # Потоковая загрузка больших файлов
+        chunk_container = QWidget()
+        chunk_layout = QVBoxLayout(chunk_container)
+        chunk_layout.setSpacing(1)
+        chunk_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.chunked_cb = QCheckBox('Потоковая загрузка')
+        self.chunked_cb.setToolTip(
+            "Файл читается блоками, статистики накапливаются без загрузки\n"
+            "всей таблицы в память. Предобработка и сохранение недоступны."
+        )
+        self.chunk_size_spin = QSpinBox()
+        self.chunk_size_spin.setRange(1000, 10000000)
+        self.chunk_size_spin.setSingleStep(10000)
+        self.chunk_size_spin.setValue(100000)
+        self.chunk_size_spin.setSuffix(' строк')
+        self.chunk_size_spin.setEnabled(False)
+        self.chunked_cb.toggled.connect(self.chunk_size_spin.setEnabled)
+        
+        chunk_layout.addWidget(self.chunked_cb)
+        chunk_layout.addWidget(self.chunk_size_spin)
+        top_layout.addWidget(chunk_container)
+        
+        # Приближённые статистики по скетчам с заданной погрешностью
+        approximate_container = QWidget()
+        approximate_layout = QVBoxLayout(approximate_container)
+        approximate_layout.setSpacing(1)
+        approximate_layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.approximate_cb = QCheckBox('Приближённая статистика')
+        self.approximate_cb.setToolTip(
+            "Число уникальных значений (HyperLogLog), частые значения (Count-Min)\n"
+            "и квартили (KLL) оцениваются скетчами без сортировки и точных частот.\n"
+            "Погрешность выводится рядом с каждой оценкой. В потоковом режиме\n"
+            "настройка применяется при загрузке файла."
+        )
+        self.approximate_error_spin = QDoubleSpinBox()
+        self.approximate_error_spin.setRange(0.1, 10.0)
+        self.approximate_error_spin.setSingleStep(0.5)
+        self.approximate_error_spin.setValue(1.0)
+        self.approximate_error_spin.setPrefix('±')
+        self.approximate_error_spin.setSuffix(' %')
+        self.approximate_error_spin.setEnabled(False)
+        self.approximate_cb.toggled.connect(self.approximate_error_spin.setEnabled)
+        
+        approximate_layout.addWidget(self.approximate_cb)
+        approximate_layout.addWidget(self.approximate_error_spin)
+        top_layout.addWidget(approximate_container)
+        
+        # Число значений на вкладках уникальных значений и частот
+        self.top_n_spin = QSpinBox()
+        self.top_n_spin.setRange(1, 10000)
+        self.top_n_spin.setValue(20)
+        self.top_n_spin.setPrefix('top ')
+        self.top_n_spin.setSuffix(' значений')
+        self.top_n_spin.setToolTip(
+            "Сколько значений каждой колонки выводить на вкладках уникальных\n"
+            "значений и частот. Полный список загружается постранично."
+        )
+        top_layout.addWidget(self.top_n_spin)
+        
         # Кнопка сохранения
         self.save_btn = QPushButton('Сохранить датасет')
         top_layout.addWidget(self.save_btn)
         
+        # Модель предобработки: сохранение и применение к новым файлам
+        self.save_model_btn = QPushButton('Сохранить модель')
+        top_layout.addWidget(self.save_model_btn)
+        
+        self.apply_model_btn = QPushButton('Применить модель')
+        top_layout.addWidget(self.apply_model_btn)
+        
         layout.addWidget(top_panel)
         
+    def setup_progress_bar(self, layout):
+        progress_layout = QHBoxLayout()
+        
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setTextVisible(True)
+        self.progress_bar.hide()
+        progress_layout.addWidget(self.progress_bar)
+        
+        # Кнопка отмены фоновой операции
+        self.cancel_btn = QPushButton('Отмена')
+        self.cancel_btn.hide()
+        progress_layout.addWidget(self.cancel_btn)
+        
+        layout.addLayout(progress_layout)
+        
+    def get_chunk_size(self):
+        """Размер блока для потоковой загрузки или None"""
+        if self.chunked_cb.isChecked():
+            return self.chunk_size_spin.value()
+        return None
+        
+    def _add_page_controls(self, layout):
+        """Постраничный просмотр полного списка значений колонки под сводкой вкладки"""
+        controls = QHBoxLayout()
+        column_combo = QComboBox()
+        column_combo.setMinimumWidth(200)
+        page_spin = QSpinBox()
+        page_spin.setRange(1, 1)
+        page_spin.setPrefix('стр. ')
+        page_btn = QPushButton('Показать полный список')
+        column_combo.currentIndexChanged.connect(lambda: page_spin.setValue(1))
+        controls.addWidget(QLabel('Колонка:'))
+        controls.addWidget(column_combo)
+        controls.addWidget(page_spin)
+        controls.addWidget(page_btn)
+        controls.addStretch()
+        layout.addLayout(controls)
+        
+        page_text = QTextEdit()
+        page_text.setReadOnly(True)
+        layout.addWidget(page_text)
+        return column_combo, page_spin, page_btn, page_text
+        
+    def set_page_columns(self, columns):
+        """Колонки для постраничного просмотра (после загрузки или предобработки)"""
+        for combo in (self.unique_page_column, self.value_counts_page_column):
+            current = combo.currentText()
+            combo.clear()
+            combo.addItems([str(col) for col in columns])
+            if current:
+                combo.setCurrentText(current)
+                
+    def show_page(self, page_spin, page_text, text, pages):
+        """Вывод страницы полного списка"""
+        page_spin.setMaximum(pages)
+        page_text.setText(text)
+        
+    def get_approximate_error(self):
+        """Допустимая погрешность приближённых статистик (доля) или None"""
+        if self.approximate_cb.isChecked():
+            return self.approximate_error_spin.value() / 100
+        return None
+        
+    def show_progress(self, fraction, message=''):
+        """Отображение прогресса загрузки"""
+        self.progress_bar.show()
+        self.progress_bar.setValue(int(min(max(fraction, 0.0), 1.0) * 100))
+        self.progress_bar.setFormat(f"%p% {message}")
+        
+    def hide_progress(self):
+        self.progress_bar.hide()
+        self.progress_bar.setValue(0)
+        
+    def set_busy(self, busy, message="Загрузка..."):
+        """Блокировка элементов управления на время фоновой операции.
+        
+        Параметры предобработки и число выводимых значений тоже
+        блокируются: их смена во время расчёта запускала бы повторную
+        предобработку после его завершения.
+        """
+        for widget in (self.load_btn, self.save_btn, self.export_html_btn,
+                       self.export_text_btn, self.chunked_cb, self.chunk_size_spin,
+                       self.optimize_memory_cb, self.save_model_btn, self.apply_model_btn,
+                       self.unique_page_btn, self.value_counts_page_btn,
+                       self.zero_values_input, self.normalize_cb, self.encoding_combo,
+                       self.max_categories_spin, self.other_bucket_cb, self.top_n_spin):
+            widget.setEnabled(not busy)
+        if not busy:
+            self.chunk_size_spin.setEnabled(self.chunked_cb.isChecked())
+        self.cancel_btn.setVisible(busy)
+        if busy:
+            self.show_progress(0.0, message)
+        
+    def clear_results(self):
+        """Очистка всех вкладок перед новым анализом"""
+        for text_widget in (self.info_text, self.describe_text, self.corr_text,
+                            self.unique_text, self.value_counts_text,
+                            self.unique_page_text, self.value_counts_page_text):
+            text_widget.clear()
+        self.clear_graphs()
+        
     def setup_tabs(self, layout):
         self.tabs = QTabWidget()
         layout.addWidget(self.tabs)
@@ -263,6 +469,8 @@ class MainView(QMainWindow):
         self.unique_text = QTextEdit()
         self.unique_text.setReadOnly(True)
         self.unique_layout.addWidget(self.unique_text)
+        (self.unique_page_column, self.unique_page_spin, self.unique_page_btn,
+         self.unique_page_text) = self._add_page_controls(self.unique_layout)
         self.tabs.addTab(self.unique_tab, "Уникальные значения (df.unique)")
         
         # Вкладка с value counts
@@ -271,29 +479,17 @@ class MainView(QMainWindow):
         self.value_counts_text = QTextEdit()
         self.value_counts_text.setReadOnly(True)
         self.value_counts_layout.addWidget(self.value_counts_text)
+        (self.value_counts_page_column, self.value_counts_page_spin, self.value_counts_page_btn,
+         self.value_counts_page_text) = self._add_page_controls(self.value_counts_layout)
         self.tabs.addTab(self.value_counts_tab, "Частота значений (df.value_counts)")
         
         # Вкладка с графиками
         self.graphs_tab = QWidget()
         self.graphs_layout = QVBoxLayout(self.graphs_tab)
         
-        # Создаем скролл-область для графиков
-        self.graphs_scroll = QScrollArea()
-        self.graphs_scroll.setWidgetResizable(True)
-        self.graphs_scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        self.graphs_scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
-        
-        # Создаем контейнер для графиков
-        self.graphs_content = QWidget()
-        self.graphs_content_layout = QVBoxLayout(self.graphs_content)
-        self.graphs_content_layout.setSpacing(30)
-        self.graphs_content_layout.setContentsMargins(20, 20, 20, 20)
-        
-        # Устанавливаем минимальную ширину контейнера
-        self.graphs_content.setMinimumWidth(800)
-        
-        self.graphs_scroll.setWidget(self.graphs_content)
-        self.graphs_layout.addWidget(self.graphs_scroll)
+        # Список графиков: изображения строятся при прокрутке к ним
+        self.graphs_list = PlotList()
+        self.graphs_layout.addWidget(self.graphs_list)
         self.tabs.addTab(self.graphs_tab, "Графики")
         
     def show_error(self, title, message):
@@ -310,7 +506,8 @@ class MainView(QMainWindow):
             self,
             "Выберите датасет",
             "",
-            "Все файлы (*);;CSV файлы (*.csv);;Excel файлы (*.xlsx *.xls);;Текстовые файлы (*.txt *.tsv)"
+            "Все файлы (*);;CSV файлы (*.csv);;Excel файлы (*.xlsx *.xls);;Текстовые файлы (*.txt *.tsv);;"
+            "Parquet файлы (*.parquet *.pq);;Feather / Arrow IPC файлы (*.feather *.arrow *.ipc)"
         )
         
     def get_save_file_name(self):
@@ -318,17 +515,32 @@ class MainView(QMainWindow):
             self,
             "Сохранить датасет",
             "",
-            "CSV файлы (*.csv);;Excel файлы (*.xlsx);;Текстовые файлы (*.txt)"
+            "CSV файлы (*.csv);;Excel файлы (*.xlsx);;Текстовые файлы (*.txt);;"
+            "Parquet файлы (*.parquet);;Feather / Arrow IPC файлы (*.feather *.arrow)"
+        )
+        
+    def get_model_save_file_name(self):
+        return QFileDialog.getSaveFileName(
+            self,
+            "Сохранить модель предобработки",
+            "",
+            "Модель предобработки (*.json.gz)"
+        )
+        
+    def get_model_open_file_name(self):
+        return QFileDialog.getOpenFileName(
+            self,
+            "Выберите модель предобработки",
+            "",
+            "Модель предобработки (*.json.gz);;Все файлы (*)"
         )
         
     def clear_graphs(self):
-        for i in reversed(range(self.graphs_content_layout.count())): 
-            self.graphs_content_layout.itemAt(i).widget().setParent(None)
+        self.graphs_list.clear()
             
-    def add_graph(self, fig):
-        canvas = FigureCanvas(fig)
-        canvas.setMinimumHeight(400)
-        self.graphs_content_layout.addWidget(canvas)
+    def set_graphs(self, plots):
+        """Список графиков [(заголовок, размер)]: изображения запрашиваются при прокрутке"""
+        self.graphs_list.set_plots(plots)
         
     def show_plots(self, plots):
         """Отображение графиков"""
@@ -374,11 +586,8 @@ class MainView(QMainWindow):
             self, "Сохранить как HTML", "", "HTML files (*.html)"
         )
         if file_name:
-            try:
-                self.presenter.export_to_html(file_name)
-                QMessageBox.information(self, "Успех", "Данные успешно экспортированы в HTML")
-            except Exception as e:
-                QMessageBox.critical(self, "Ошибка", str(e))
+            # Результат и ошибки выводит презентер по завершении фоновой задачи
+            self.presenter.export_to_html(file_name)
                 
     def export_to_text(self):
         """Экспорт данных в текст"""
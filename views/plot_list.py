@@ -0,0 +1,150 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtGui import QPixmap
+from PyQt6.QtWidgets import QLabel, QScrollArea, QVBoxLayout, QWidget
+
+
+class PlotList(QScrollArea):
+    """Виртуализированный список графиков.
+
+    Графики задаются описаниями (заголовок и размер), для каждого
+    создаётся заглушка нужного размера. Изображения запрашиваются
+    сигналом render_requested только для графиков в области просмотра
+    (с запасом на полэкрана) и хранятся как QPixmap. Если объём
+    изображений превышает memory_budget байт, изображения невидимых
+    графиков выгружаются, начиная с давно показанных, и при следующей
+    прокрутке к ним запрашиваются снова.
+    """
+
+    render_requested = pyqtSignal(list)
+
+    def __init__(self, memory_budget=256 * 1024 ** 2, dpi=100, parent=None):
+        super().__init__(parent)
+        self.memory_budget = memory_budget
+        self.dpi = dpi
+        self.setWidgetResizable(True)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+
+        self.content = QWidget()
+        self.content_layout = QVBoxLayout(self.content)
+        self.content_layout.setSpacing(30)
+        self.content_layout.setContentsMargins(20, 20, 20, 20)
+        self.content_layout.setAlignment(Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
+        self.content.setMinimumWidth(800)
+        self.setWidget(self.content)
+
+        self._labels = []
+        self._titles = []
+        # Кэш изображений: индекс -> QPixmap (в порядке последнего показа)
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        # Запрошенные, но ещё не полученные графики
+        self._pending = set()
+
+        # Пересчёт видимых графиков не чаще одного раза за цикл прокрутки
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(50)
+        self._update_timer.timeout.connect(self.update_visible)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_update)
+
+    def set_plots(self, plots):
+        """Новый список графиков: [(заголовок, (ширина, высота) в дюймах)]"""
+        self.clear()
+        for title, figsize in plots:
+            label = QLabel("График строится...")
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.setFixedSize(int(figsize[0] * self.dpi), int(figsize[1] * self.dpi))
+            label.setToolTip(title)
+            label.setStyleSheet("QLabel { color: #888888; border: 1px dashed #cccccc; }")
+            self.content_layout.addWidget(label)
+            self._labels.append(label)
+            self._titles.append(title)
+        self._schedule_update()
+
+    def clear(self):
+        """Удаление всех графиков и изображений"""
+        for label in self._labels:
+            self.content_layout.removeWidget(label)
+            label.deleteLater()
+        self._labels = []
+        self._titles = []
+        self._cache.clear()
+        self._cache_bytes = 0
+        self._pending.clear()
+
+    def set_image(self, index, image):
+        """Готовое изображение графика (PNG)"""
+        self._pending.discard(index)
+        if index >= len(self._labels):
+            return
+        pixmap = QPixmap()
+        pixmap.loadFromData(image, 'PNG')
+        label = self._labels[index]
+        label.setStyleSheet("")
+        label.setFixedSize(pixmap.size())
+        label.setPixmap(pixmap)
+        if index in self._cache:
+            self._cache_bytes -= _pixmap_bytes(self._cache.pop(index))
+        self._cache[index] = pixmap
+        self._cache_bytes += _pixmap_bytes(pixmap)
+        self._evict()
+
+    def render_failed(self, indices):
+        """Графики не построены (ошибка или отмена): их можно запросить снова"""
+        self._pending.difference_update(indices)
+
+    def visible_indices(self):
+        """Индексы графиков в области просмотра (с запасом на полэкрана)"""
+        height = self.viewport().height()
+        top = self.verticalScrollBar().value() - height // 2
+        bottom = self.verticalScrollBar().value() + height + height // 2
+        return [i for i, label in enumerate(self._labels)
+                if label.y() < bottom and label.y() + label.height() > top]
+
+    def update_visible(self):
+        """Запрос изображений для видимых графиков, которых нет в кэше"""
+        missing = []
+        for i in self.visible_indices():
+            if i in self._cache:
+                self._cache.move_to_end(i)
+            elif i not in self._pending:
+                missing.append(i)
+        if missing:
+            self._pending.update(missing)
+            self.render_requested.emit(missing)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._schedule_update()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._schedule_update()
+
+    def _schedule_update(self, *args):
+        if self._labels:
+            self._update_timer.start()
+
+    def _evict(self):
+        """Выгрузка изображений невидимых графиков сверх бюджета памяти"""
+        if self._cache_bytes <= self.memory_budget:
+            return
+        visible = set(self.visible_indices())
+        for index in list(self._cache):
+            if self._cache_bytes <= self.memory_budget:
+                break
+            if index in visible:
+                continue
+            pixmap = self._cache.pop(index)
+            self._cache_bytes -= _pixmap_bytes(pixmap)
+            label = self._labels[index]
+            label.clear()
+            label.setText("График будет построен при прокрутке")
+            label.setStyleSheet("QLabel { color: #888888; border: 1px dashed #cccccc; }")
+
+
+def _pixmap_bytes(pixmap):
+    return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8